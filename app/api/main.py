@@ -1,7 +1,8 @@
 from fastapi import APIRouter
-from app.api.routes import document, extract
+from app.api.routes import document, extract, jobs
 
 api_router = APIRouter()
 
 api_router.include_router(document.router, prefix="/documents", tags=["Documents"])
-api_router.include_router(extract.router, prefix="/extract", tags=["Extract"])
\ No newline at end of file
+api_router.include_router(extract.router, prefix="/extract", tags=["Extract"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
\ No newline at end of file
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, UploadFile, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, UploadFile, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from app.core.database import get_session
-from app.services.document_service import save_document_to_db
+from app.services.document_service import save_document_to_db, list_documents_page, iter_page_texts
+from app.services.ingest_service import ingest_files
+from app.services.extract_service import load_tables
 
 router = APIRouter()
 
@@ -10,7 +16,7 @@ router = APIRouter()
     summary="Upload PDF — AI detects Fund & Company automatically",
     tags=["Documents"]
 )
-def upload_document(
+async def upload_document(
     file: UploadFile,
     session: Session = Depends(get_session)
 ):
@@ -18,14 +24,14 @@ def upload_document(
     Upload a PDF document to the system.
 
     This endpoint will:
-    - Save the PDF to disk
+    - Stream the PDF to disk (hash + PDF header check + size limit on the fly)
     - Extract a short preview of text from the PDF
     - Use Ollama (LLM) to detect fund & company names automatically
     - Upsert Fund and Company records if they don’t exist
     - Link the new Document to the correct fund/company in the DB
     """
     try:
-        document = save_document_to_db(file, session)
+        document = await save_document_to_db(file, session)
 
         return {
             "message": "✅ Document uploaded and linked successfully",
@@ -45,6 +51,44 @@ def upload_document(
         raise HTTPException(status_code=500, detail=f"Error uploading document: {e}")
 
 
+@router.post(
+    "/upload/bulk",
+    summary="Upload many PDFs at once — batched Fund & Company detection",
+    tags=["Documents"]
+)
+async def upload_documents_bulk(
+    files: list[UploadFile],
+    use_cache: bool = True,
+    session: Session = Depends(get_session)
+):
+    """
+    Bulk version of /upload for quarterly drops of many reports.
+
+    Files are stored first, previews are extracted in parallel, fund/company
+    names are detected with batched AI prompts and all documents are inserted
+    in one transaction. Returns a status per file (created / duplicate /
+    rejected / failed) instead of failing the whole request.
+    """
+    report = await ingest_files([(f.filename, f.file) for f in files], session, use_cache=use_cache)
+    return {
+        "message": f"✅ Processed {len(report)} files",
+        "created": sum(1 for r in report if r["status"] == "created"),
+        "duplicates": sum(1 for r in report if r["status"] == "duplicate"),
+        "failed": sum(1 for r in report if r["status"] in ("rejected", "failed")),
+        "files": [
+            {
+                "file_name": r["file_name"],
+                "status": r["status"],
+                "document_id": r["document_id"],
+                "fund_id": r.get("fund_id"),
+                "company_id": r.get("company_id"),
+                "error": r["error"]
+            }
+            for r in report
+        ]
+    }
+
+
 @router.get(
     "/{document_id}",
     summary="Get document details",
@@ -71,24 +115,96 @@ def get_document(document_id: str, session: Session = Depends(get_session)):
 
 
 @router.get(
-    "/",
-    summary="List all uploaded documents",
+    "/{document_id}/pages",
+    summary="Stream extracted page text",
     tags=["Documents"]
 )
-def list_documents(session: Session = Depends(get_session)):
+def get_document_pages(
+    document_id: str,
+    from_page: Optional[int] = Query(None, alias="from", ge=1),
+    to_page: Optional[int] = Query(None, alias="to", ge=1),
+    session: Session = Depends(get_session)
+):
     """
-    List all uploaded documents currently stored in the database.
+    Stream the extracted raw text of a document as NDJSON, one page per line
+    (`page_number`, `extraction_method`, `text`). Use `from` / `to` to fetch
+    a page range instead of the whole document.
     """
     from app.models.document import Document
-    documents = session.query(Document).all()
-    return [
-        {
-            "id": d.id,
-            "file_name": d.file_name,
-            "fund_id": d.fund_id,
-            "company_id": d.company_id,
-            "uploaded_at": d.uploaded_at,
-            "file_path": d.file_path
-        }
-        for d in documents
-    ]
\ No newline at end of file
+    document = session.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    return StreamingResponse(
+        iter_page_texts(document.id, from_page, to_page),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get(
+    "/{document_id}/tables",
+    summary="Get extracted tables",
+    tags=["Documents"]
+)
+def get_document_tables(
+    document_id: str,
+    page: Optional[int] = Query(None, ge=1),
+    session: Session = Depends(get_session)
+):
+    """
+    Return the tables found by the PDF extraction job as structured rows
+    (a list of rows, each a list of cell strings), optionally for one page.
+    """
+    from app.models.document import Document
+    document = session.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    tables = load_tables(document.id, session)
+    if page is not None:
+        tables = [t for t in tables if t["page_number"] == page]
+    return {"document_id": document.id, "tables": tables}
+
+
+@router.get(
+    "/",
+    summary="List uploaded documents (paginated)",
+    tags=["Documents"]
+)
+def list_documents(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fund_id: Optional[UUID] = None,
+    company_id: Optional[UUID] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    session: Session = Depends(get_session)
+):
+    """
+    List uploaded documents, newest first.
+    Pass the returned `next_cursor` as `cursor` to fetch the next page;
+    it is null on the last page. Filter by fund, company or upload date.
+    """
+    documents, next_cursor = list_documents_page(
+        session,
+        limit=limit,
+        cursor=cursor,
+        fund_id=fund_id,
+        company_id=company_id,
+        uploaded_from=uploaded_from,
+        uploaded_to=uploaded_to
+    )
+    return {
+        "items": [
+            {
+                "id": d.id,
+                "file_name": d.file_name,
+                "fund_id": d.fund_id,
+                "company_id": d.company_id,
+                "uploaded_at": d.uploaded_at,
+                "file_path": d.file_path
+            }
+            for d in documents
+        ],
+        "next_cursor": next_cursor
+    }
\ No newline at end of file
@@ -1,78 +1,78 @@
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
+from app.core.config import settings
 from app.core.database import get_session
-from app.services.extract_service import (
-    extract_text_from_document,
-    extract_company_data_ai,
-    extract_financials_ai
-)
+from app.services.job_service import enqueue_job
+from app.services.llm_cache import cache_stats, clear_cache
 
 router = APIRouter()
 
+def _queued_response(message: str, job) -> dict:
+    return {
+        "message": message,
+        "job_id": job.id,
+        "document_id": job.document_id,
+        "status": job.status,
+        "status_url": f"{settings.API_V1_STR}/jobs/{job.id}",
+        "pages_url": f"{settings.API_V1_STR}/documents/{job.document_id}/pages"
+    }
+
 # ==============================================================
 #  1. Basic PDF Text Extraction
 # ==============================================================
 
-@router.post("/pdf/{document_id}", summary="Extract raw text from PDF")
-def extract_pdf(document_id: str, session: Session = Depends(get_session)):
-    pages = extract_text_from_document(document_id, session)
-
-    # 🧠 Retrieve full text for returning in response
-    from app.models.extracted_field import ExtractedField
-    extracted_pages = session.query(ExtractedField).filter(
-        ExtractedField.document_id == document_id
-    ).order_by(ExtractedField.page_number).all()
-    
-    full_text = "\n".join([p.extracted_value or "" for p in extracted_pages])
-
-    return {
-        "message": "PDF text extraction completed",
-        "pages_extracted": pages,
-        "document_id": document_id,
-        "raw_text": full_text
-    }
+@router.post("/pdf/{document_id}", status_code=202, summary="Queue raw text extraction from PDF")
+async def extract_pdf(document_id: str, session: Session = Depends(get_session)):
+    job = await enqueue_job(document_id, "pdf", session)
+    return _queued_response("PDF text extraction queued", job)
 
 # ==============================================================
 #  2. Company + Investment AI Extraction
 # ==============================================================
 
-@router.post("/company-ai/{document_id}", summary="Extract company and investment info using AI")
-def extract_company(document_id: str, session: Session = Depends(get_session)):
-    result = extract_company_data_ai(document_id, session)
+@router.post("/company-ai/{document_id}", status_code=202, summary="Queue company and investment extraction using AI")
+async def extract_company(
+    document_id: str,
+    use_cache: bool = True,
+    session: Session = Depends(get_session)
+):
+    job = await enqueue_job(document_id, "company_ai", session, use_cache=use_cache)
+    return _queued_response("AI company extraction queued", job)
 
-    # Retrieve extracted text
-    from app.models.extracted_field import ExtractedField
-    extracted_pages = session.query(ExtractedField).filter(
-        ExtractedField.document_id == document_id
-    ).order_by(ExtractedField.page_number).all()
-    full_text = "\n".join([p.extracted_value or "" for p in extracted_pages])
+# ==============================================================
+#  3. Financial Highlights AI Extraction
+# ==============================================================
 
-    return {
-        "message": result["message"],
-        "company": result["company"],
-        "investment": result["investment"],
-        "ai_raw_output": result["ai_raw_output"],
-        "raw_text": full_text 
-    }
+@router.post("/financials-ai/{document_id}", status_code=202, summary="Queue financial highlights extraction using AI")
+async def extract_financials(
+    document_id: str,
+    use_cache: bool = True,
+    session: Session = Depends(get_session)
+):
+    job = await enqueue_job(document_id, "financials_ai", session, use_cache=use_cache)
+    return _queued_response("AI financial extraction queued", job)
 
 # ==============================================================
-#  3. Financial Highlights AI Extraction
+#  4. Combined Company + Financial AI Extraction
 # ==============================================================
 
-@router.post("/financials-ai/{document_id}", summary="Extract financial highlights using AI")
-def extract_financials(document_id: str, session: Session = Depends(get_session)):
-    result = extract_financials_ai(document_id, session)
+@router.post("/all/{document_id}", status_code=202, summary="Queue company, investment and financial extraction in one pass")
+async def extract_all(
+    document_id: str,
+    use_cache: bool = True,
+    session: Session = Depends(get_session)
+):
+    job = await enqueue_job(document_id, "all_ai", session, use_cache=use_cache)
+    return _queued_response("AI company + financial extraction queued", job)
 
-    # Retrieve extracted text
-    from app.models.extracted_field import ExtractedField
-    extracted_pages = session.query(ExtractedField).filter(
-        ExtractedField.document_id == document_id
-    ).order_by(ExtractedField.page_number).all()
-    full_text = "\n".join([p.extracted_value or "" for p in extracted_pages])
+# ==============================================================
+#  5. LLM Response Cache
+# ==============================================================
 
-    return {
-        "message": result["message"],
-        "financial_highlight": result["financial_highlight"],
-        "ai_raw_output": result["ai_raw_output"],
-        "raw_text": full_text 
-    }
\ No newline at end of file
+@router.get("/llm-cache", summary="LLM response cache statistics")
+def get_llm_cache_stats():
+    return cache_stats()
+
+@router.delete("/llm-cache", summary="Clear the LLM response cache")
+def delete_llm_cache():
+    return {"message": "LLM cache cleared", "deleted": clear_cache()}
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from app.core.database import get_session
+from app.services.job_service import get_job, job_to_dict
+
+router = APIRouter()
+
+@router.get("/{job_id}", summary="Get extraction job status and result")
+def get_job_status(job_id: str, session: Session = Depends(get_session)):
+    """
+    Poll a background extraction job.
+    `status` is one of queued / running / completed / failed, and
+    `result` holds the extraction output once the job has completed.
+    """
+    return job_to_dict(get_job(job_id, session))
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Command-line entry points.
+
+    python -m app.cli ingest <directory-or-zip> [--no-cache]
+    python -m app.cli migrate [--revision REV] [--sql]
+"""
+import os
+import sys
+import asyncio
+import zipfile
+import argparse
+from contextlib import ExitStack
+from functools import partial
+from sqlmodel import Session
+from app.core.database import ALEMBIC_INI, engine, verify_schema_version
+from app.services.ingest_service import ingest_files
+from app.services.job_service import shutdown_job_workers
+from app.services.ollama_service import ollama_client
+
+def _collect_files(path: str, stack: ExitStack) -> list[tuple[str, object]]:
+    """
+    (file_name, opener) for every PDF in a directory tree or zip archive.
+    Files are opened one at a time during ingestion, not here, so a large
+    drop does not run out of file descriptors.
+    """
+    files = []
+    if zipfile.is_zipfile(path):
+        archive = stack.enter_context(zipfile.ZipFile(path))
+        for name in sorted(archive.namelist()):
+            if name.lower().endswith(".pdf") and not name.endswith("/"):
+                files.append((os.path.basename(name), partial(archive.open, name)))
+    elif os.path.isdir(path):
+        for root, _dirs, names in os.walk(path):
+            for name in sorted(names):
+                if name.lower().endswith(".pdf"):
+                    files.append((name, partial(open, os.path.join(root, name), "rb")))
+    else:
+        raise SystemExit(f"Not a directory or zip archive: {path}")
+    return files
+
+
+async def _ingest(files: list, session: Session, use_cache: bool) -> list[dict]:
+    try:
+        return await ingest_files(files, session, use_cache=use_cache)
+    finally:
+        # The connection pool belongs to this asyncio.run loop; close it before the loop goes away
+        await ollama_client.aclose()
+
+
+def ingest(path: str, use_cache: bool = True) -> int:
+    verify_schema_version()
+    try:
+        with ExitStack() as stack:
+            files = _collect_files(path, stack)
+            if not files:
+                print(f"No PDF files found in {path}")
+                return 0
+
+            print(f"📥 Ingesting {len(files)} PDF files from {path} ...")
+            with Session(engine) as session:
+                report = asyncio.run(_ingest(files, session, use_cache))
+    finally:
+        shutdown_job_workers()
+
+    for entry in report:
+        detail = entry["error"] or entry["document_id"]
+        print(f"{entry['status']:<10} {entry['file_name']}  {detail}")
+
+    failed = sum(1 for r in report if r["status"] in ("rejected", "failed"))
+    print(f"\nDone: {len(report) - failed} stored, {failed} failed")
+    return 1 if failed else 0
+
+
+def migrate(revision: str = "head", sql: bool = False) -> int:
+    """Upgrade the database schema; with sql=True print the SQL instead of running it (offline)."""
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(ALEMBIC_INI), revision, sql=sql)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = commands.add_parser("ingest", help="Bulk-ingest a directory or zip of PDFs")
+    ingest_cmd.add_argument("path", help="Directory (walked recursively) or .zip archive")
+    ingest_cmd.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+
+    migrate_cmd = commands.add_parser("migrate", help="Upgrade the database schema (Alembic)")
+    migrate_cmd.add_argument("--revision", default="head", help="Target revision (default: head)")
+    migrate_cmd.add_argument("--sql", action="store_true", help="Print the upgrade SQL instead of running it")
+
+    args = parser.parse_args(argv)
+    if args.command == "ingest":
+        return ingest(args.path, use_cache=not args.no_cache)
+    if args.command == "migrate":
+        return migrate(args.revision, sql=args.sql)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,86 @@
+import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str
     OLLAMA_API_URL: str = "http://localhost:11434"
+    OLLAMA_MODEL: str = "phi3"
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0
+    OLLAMA_READ_TIMEOUT: float = 300.0
+    OLLAMA_MAX_RETRIES: int = 2
+    OLLAMA_RETRY_BACKOFF: float = 1.0  # seconds, doubled on each retry
+    OLLAMA_MAX_CONCURRENCY: int = 1  # in-flight generations the Ollama host can serve
+    LLM_CONTEXT_TOKENS: int = 4096  # num_ctx requested from the model
+    LLM_OUTPUT_TOKENS: int = 512  # context reserved for the JSON answer
+
+    # Page retrieval (BM25) before prompting
+    RETRIEVAL_TOP_K: int = 5
+    PAGE_INDEX_DIR: str = "cache/page_index"
+    PAGE_INDEX_MAX_BYTES: int = 256 * 1024 * 1024  # least recently used indexes are evicted beyond this
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
 
+    # Database engine
+    DB_ECHO: Optional[bool] = None  # None → echo SQL only in development
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_BULK_BATCH_SIZE: int = 1000  # rows per executemany batch
+
+    # Background extraction jobs
+    JOB_PDF_WORKERS: int = 2  # process pool size for PDF parsing / OCR
+    JOB_LLM_CONCURRENCY: int = 1  # LLM jobs allowed to run at the same time
+
+    # OCR (scanned PDFs)
+    OCR_WORKERS: Optional[int] = None  # None → this job's share of the cores (pdf_worker_budget)
+    OCR_DPI: int = 300
+    OCR_LANG: str = "eng"
+    OCR_PAGES_PER_TASK: int = 1  # pages rasterized together by one worker
+    OCR_MIN_PAGE_CHARS: int = 25  # pages with fewer text chars are OCR'd
+    OCR_MIN_CHAR_DENSITY: float = 2.0  # chars per sq inch below which image pages are OCR'd
+
+    # Tables (camelot runs only on pages detected as tables)
+    TABLE_WORKERS: Optional[int] = None  # None → pdf_worker_budget (runs after OCR, same budget)
+    TABLE_MIN_RULINGS: int = 3  # long horizontal / vertical rules for a lattice page
+    TABLE_MIN_NUMERIC_ROWS: int = 4  # rows with numeric columns for a stream page
+    TABLE_MIN_NUMERIC_COLUMNS: int = 2  # numbers on a line for it to count as a row
+
+    # Uploads + content-addressed extraction cache
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    INGEST_DETECT_BATCH_SIZE: int = 5  # previews per fund/company detection prompt
+    INGEST_PREVIEW_CHARS: int = 1500  # preview text per document in a batch prompt
+    ENTITY_MATCH_THRESHOLD: float = 0.8  # trigram similarity for a fuzzy fund/company name match
+    ENTITY_INDEX_TTL_SECONDS: int = 300  # reload the name index to see entities created by other processes
+    EXTRACTION_CACHE_DIR: str = "cache/extraction"
+    EXTRACTION_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Document storage ("local" or "s3"; any S3-compatible store, e.g. MinIO)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_ROOT: str = "pdf_samples"
+    STORAGE_READ_BLOCK_SIZE: int = 256 * 1024  # bytes per ranged GET on remote backends
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+
+    # LLM response cache
+    LLM_CACHE_PATH: str = "cache/llm_cache.sqlite3"
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+
+    def pdf_worker_budget(self) -> int:
+        """
+        Processes one PDF job may start for OCR / table parsing. Those pools
+        run inside the JOB_PDF_WORKERS job processes, so each job gets its
+        share of the cores instead of all of them.
+        """
+        return max(1, (os.cpu_count() or 1) // max(1, self.JOB_PDF_WORKERS))
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,17 +1,63 @@
-from sqlmodel import SQLModel, create_engine, Session
+import os
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import create_engine, Session
 from app.core.config import settings
 
+# SQL echo defaults to on only in development; override with DB_ECHO
+echo = settings.DB_ECHO if settings.DB_ECHO is not None else settings.ENVIRONMENT == "development"
+
 # PostgreSQL engine connection
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=echo,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+def schema_head() -> str:
+    """Head revision of migrations/versions, read from the migration scripts themselves."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
 
-def create_db_and_tables():
+def verify_schema_version():
     """
-    Import all SQLModel models here to register them with metadata,
-    then create tables in PostgreSQL if they don't exist.
+    Fail fast if the database is not at the head revision. Startup only reads
+    alembic_version; the schema itself is changed offline with
+    `python -m app.cli migrate` (see alembic.ini).
     """
-    from app.models import company, fund, investment, financial, document, extracted_field, correction
-    SQLModel.metadata.create_all(engine)
+    try:
+        with engine.connect() as conn:
+            revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        revision = None
+    head = schema_head()
+    if revision != head:
+        raise RuntimeError(
+            f"Database schema is at revision {revision or 'none'}, expected {head}. "
+            "Run `python -m app.cli migrate` first."
+        )
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def bulk_insert(session: Session, model, rows: list[dict]) -> int:
+    """
+    Insert many rows with one executemany per batch instead of one ORM
+    INSERT per object. Model defaults (ids, timestamps) are filled in here
+    because Core inserts skip Python-side default factories. Caller commits.
+    """
+    if not rows:
+        return 0
+
+    values = [model(**row).model_dump() for row in rows]
+    batch_size = settings.DB_BULK_BATCH_SIZE
+    for start in range(0, len(values), batch_size):
+        session.execute(insert(model.__table__), values[start:start + batch_size])
+    return len(values)
\ No newline at end of file
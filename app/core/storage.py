@@ -0,0 +1,249 @@
+import io
+import os
+import mmap
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+from app.core.config import settings
+
+def shard_key(content_hash: str, suffix: str = ".pdf") -> str:
+    """ab/cd/abcd…pdf — two directory levels keep any one directory small at millions of files."""
+    return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{suffix}"
+
+
+class StorageBackend:
+    """Where uploaded PDFs live. Keys are relative, '/'-separated paths (see shard_key)."""
+
+    def tmp_dir(self) -> str:
+        """Directory for in-progress uploads before put_file."""
+        return tempfile.gettempdir()
+
+    def put_file(self, local_path: str, key: str):
+        """Move a finished local file into storage under key."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of the object."""
+        raise NotImplementedError
+
+    def open(self, key: str):
+        """Seekable binary file object; remote backends only fetch the ranges that are read."""
+        raise NotImplementedError
+
+    @contextmanager
+    def open_view(self, key: str):
+        """Cheapest read-only view for parsers (mmap locally, ranged reader remotely)."""
+        with self.open(key) as f:
+            yield f
+
+    @contextmanager
+    def local_path(self, key: str):
+        """A filesystem path for tools that need one (pdf2image, camelot)."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+# ==========================================================
+#  1. Local filesystem
+# ==========================================================
+
+# Documents uploaded before the storage layer stored "pdf_samples/<file>"
+# (a path under the old upload directory) instead of a key
+LEGACY_PREFIX = "pdf_samples/"
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(os.path.join(self.root, ".tmp"), exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        if key.startswith(LEGACY_PREFIX):
+            key = key[len(LEGACY_PREFIX):]  # legacy files sit directly under the root
+        path = os.path.normpath(os.path.join(self.root, *key.split("/")))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Storage key outside the storage root: {key!r}")
+        return path
+
+    def tmp_dir(self) -> str:
+        # Same filesystem as the root so put_file is an atomic rename
+        return os.path.join(self.root, ".tmp")
+
+    def put_file(self, local_path: str, key: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(local_path, path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def open(self, key: str):
+        return open(self._path(key), "rb")
+
+    @contextmanager
+    def open_view(self, key: str):
+        with open(self._path(key), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+    @contextmanager
+    def local_path(self, key: str):
+        yield self._path(key)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+# ==========================================================
+#  2. S3-compatible object store (AWS S3, MinIO, moto)
+# ==========================================================
+
+class _RangedObjectReader(io.RawIOBase):
+    """Raw reader issuing one ranged GET per read; wrap in BufferedReader for block caching."""
+
+    def __init__(self, storage: "S3Storage", key: str):
+        self._storage = storage
+        self._key = key
+        self._size = storage.size(key)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._size + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        if self._pos >= self._size:
+            return 0
+        end = min(self._pos + len(buffer), self._size)
+        data = self._storage.read_range(self._key, self._pos, end)
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+class S3Storage(StorageBackend):
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, access_key_id: Optional[str] = None,
+                 secret_access_key: Optional[str] = None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put_file(self, local_path: str, key: str):
+        self.client.upload_file(local_path, self.bucket, self._key(key))
+        os.remove(local_path)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self._key(key))["ContentLength"]
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end - 1}"
+        )
+        return response["Body"].read()
+
+    def open(self, key: str):
+        return io.BufferedReader(
+            _RangedObjectReader(self, key), buffer_size=settings.STORAGE_READ_BLOCK_SIZE
+        )
+
+    @contextmanager
+    def local_path(self, key: str):
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._key(key), path)
+            yield path
+        finally:
+            os.remove(path)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+# ==========================================================
+#  3. Backend selection
+# ==========================================================
+
+_storage: Optional[StorageBackend] = None
+_storage_pid: Optional[int] = None
+
+def get_storage() -> StorageBackend:
+    """Configured backend, created once per process (clients aren't fork-safe)."""
+    global _storage, _storage_pid
+    if _storage is None or _storage_pid != os.getpid():
+        if settings.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                bucket=settings.S3_BUCKET,
+                prefix=settings.S3_PREFIX,
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                region=settings.S3_REGION,
+                access_key_id=settings.S3_ACCESS_KEY_ID,
+                secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            )
+        elif settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorage(settings.STORAGE_LOCAL_ROOT)
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+        _storage_pid = os.getpid()
+    return _storage
@@ -1,13 +1,21 @@
 from fastapi import FastAPI
 from app.api.main import api_router
 from app.core.config import settings
-from app.core.database import create_db_and_tables
+from app.core.database import verify_schema_version
+from app.services.job_service import recover_jobs, shutdown_job_workers
+from app.services.ollama_service import ollama_client
 
 app = FastAPI(title="Data Extraction API")
 
 @app.on_event("startup")
-def startup():
-    create_db_and_tables()
+async def startup():
+    verify_schema_version()
+    await recover_jobs()
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_job_workers()
+    await ollama_client.aclose()
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -4,4 +4,8 @@ from .investment import Investment
 from .financial import FinancialHighlight
 from .document import Document
 from .extracted_field import ExtractedField
-from .correction import Correction
\ No newline at end of file
+from .extracted_table import ExtractedTable
+from .page_text import PageText
+from .correction import Correction
+from .job import ExtractionJob
+from .extraction_run import ExtractionRun
\ No newline at end of file
@@ -7,6 +7,7 @@ class Company(SQLModel, table=True):
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str
+    normalized_name: Optional[str] = Field(default=None, unique=True, index=True)  # upsert key, see entity_store
     holding_company: Optional[str] = None
     description: Optional[str] = None
     head_office_location: Optional[str] = None
\ No newline at end of file
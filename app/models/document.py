@@ -1,10 +1,15 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from uuid import UUID, uuid4
 from typing import Optional
 from datetime import datetime
 
 class Document(SQLModel, table=True):
     __tablename__ = "document"
+    # Keyset pagination filters and orders on (uploaded_at, id), newest first
+    __table_args__ = (
+        Index("ix_document_uploaded_at_id", "uploaded_at", "id"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     fund_id: Optional[UUID] = Field(default=None, foreign_key="fund.id")
@@ -12,5 +17,6 @@ class Document(SQLModel, table=True):
 
     file_name: str
     file_path: str
+    content_hash: Optional[str] = Field(default=None, index=True)  # sha256 of the PDF bytes
 
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
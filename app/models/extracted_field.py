@@ -1,10 +1,16 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from uuid import UUID, uuid4
 from typing import Optional
 from datetime import datetime
 
 class ExtractedField(SQLModel, table=True):
     __tablename__ = "extracted_field"
+    # Every lookup filters by document, then orders by page or picks fields
+    __table_args__ = (
+        Index("ix_extracted_field_document_page", "document_id", "page_number"),
+        Index("ix_extracted_field_document_field", "document_id", "field_name"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
 
@@ -14,6 +20,7 @@ class ExtractedField(SQLModel, table=True):
 
     page_number: Optional[int] = None
     source_text: Optional[str] = None
+    extraction_method: Optional[str] = None  # e.g., "text", "ocr"
 
     confidence_score: Optional[float] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field
+from uuid import UUID, uuid4
+from typing import Optional
+from datetime import datetime
+
+class ExtractedTable(SQLModel, table=True):
+    __tablename__ = "extracted_table"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+
+    document_id: UUID = Field(foreign_key="document.id", index=True)
+    page_number: int
+    table_index: int = 0  # position of the table on its page
+    flavor: str  # camelot flavor: "lattice" or "stream"
+
+    n_rows: int = 0
+    n_cols: int = 0
+    rows: str  # JSON-encoded list of rows, each a list of cell strings
+    accuracy: Optional[float] = None  # camelot parsing accuracy (0-100)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field
+from uuid import UUID, uuid4
+from typing import Optional
+from datetime import datetime
+
+class ExtractionRun(SQLModel, table=True):
+    __tablename__ = "extraction_run"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+
+    document_id: UUID = Field(foreign_key="document.id", index=True)
+    kind: str  # e.g., "company_ai", "financials_ai", "all_ai"
+    input_fingerprint: str  # hash of the pages (and model) the run was based on
+
+    result: Optional[str] = None  # JSON-encoded extraction output
+    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
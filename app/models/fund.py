@@ -6,4 +6,5 @@ class Fund(SQLModel, table=True):
     __tablename__ = "fund" 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str
+    normalized_name: Optional[str] = Field(default=None, unique=True, index=True)  # upsert key, see entity_store
     type: Optional[str] = None
\ No newline at end of file
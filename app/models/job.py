@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field
+from uuid import UUID, uuid4
+from typing import Optional
+from datetime import datetime
+
+class ExtractionJob(SQLModel, table=True):
+    __tablename__ = "extraction_job"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+
+    document_id: UUID = Field(foreign_key="document.id")
+    job_type: str  # e.g., "pdf", "company_ai", "financials_ai"
+    use_cache: bool = True  # False forces fresh LLM generations
+
+    status: str = "queued"  # queued, running, completed, failed
+    progress: int = 0  # percent complete
+    result: Optional[str] = None  # JSON-encoded job output
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from uuid import UUID, uuid4
+from typing import Optional
+from datetime import datetime
+
+class PageText(SQLModel, table=True):
+    __tablename__ = "page_text"
+    # One row per page; the unique index also serves "document, in page order" reads
+    __table_args__ = (UniqueConstraint("document_id", "page_number", name="uq_page_text_document_page"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+
+    document_id: UUID = Field(foreign_key="document.id")
+    page_number: int
+    text: str = ""
+    extraction_method: Optional[str] = None  # e.g., "text", "ocr"
+    content_hash: Optional[str] = None  # sha256 of the text, to skip unchanged pages
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,147 @@
+# app/services/chunked_extraction.py
+
+import re
+import asyncio
+from collections import Counter
+from typing import Callable
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.ollama_service import call_ollama_async
+from app.utils.chunker import chunk_pages, estimate_tokens, page_at_offset
+from app.utils.extraction_schema import json_schema, generation_options
+from app.utils.json_parser import parse_ai_fields
+
+# Values the model uses to say "not in this chunk"
+EMPTY_VALUES = {"", "-", "n/a", "na", "none", "null", "unknown", "not found", "not available", "not mentioned"}
+
+def is_empty(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in EMPTY_VALUES
+    if isinstance(value, (list, dict)):
+        return not value
+    return False
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _locate(value, text: str) -> int:
+    """Offset of the value in the chunk text (whitespace/case-insensitive), or -1."""
+    words = str(value).split()
+    if not words:
+        return -1
+    match = re.search(r"\s+".join(re.escape(w) for w in words), text, re.IGNORECASE)
+    return match.start() if match else -1
+
+
+# ==========================================================
+#  1. Reduce
+# ==========================================================
+
+def merge_chunk_results(results: list[tuple[dict, dict]], fields: list[str]) -> tuple[dict, dict]:
+    """
+    Deterministically merge per-chunk JSON results field by field.
+
+    Non-empty values win over empty ones. Each candidate is scored:
+    0.5 base, +0.3 if the value appears verbatim in its chunk's text,
+    +0.2 × the share of chunks that returned the same value. Ties go to the
+    earliest chunk. Returns (merged_values, provenance) where provenance maps
+    field → {"page_number", "confidence"} of the winning chunk.
+    """
+    merged, provenance = {}, {}
+
+    for field in fields:
+        values = [
+            (order, chunk, data.get(field))
+            for order, (chunk, data) in enumerate(results)
+            if not is_empty(data.get(field))
+        ]
+        if not values:
+            merged[field] = None
+            continue
+
+        agreement = Counter(_normalize(value) for _, _, value in values)
+        best = None
+        for order, chunk, value in values:
+            offset = _locate(value, chunk["text"])
+            confidence = 0.5 + (0.3 if offset >= 0 else 0.0)
+            confidence += 0.2 * agreement[_normalize(value)] / len(values)
+            page = page_at_offset(chunk, offset) if offset >= 0 else chunk["pages"][0]
+
+            key = (-round(confidence, 3), order)
+            if best is None or key < best[0]:
+                best = (key, value, page, round(confidence, 3))
+
+        _, value, page, confidence = best
+        merged[field] = value
+        provenance[field] = {"page_number": page, "confidence": confidence}
+
+    return merged, provenance
+
+
+# ==========================================================
+#  2. Map
+# ==========================================================
+
+async def run_chunked_extraction(
+    pages: list[tuple[int, str]],
+    build_prompt: Callable[[str], str],
+    fields: list[str],
+    use_cache: bool = True
+) -> tuple[dict, dict]:
+    """
+    Split page text into chunks that fit the model context next to the
+    prompt, extract fields from every chunk concurrently (the Ollama client
+    caps how many actually run at once) and merge the partial results.
+    Generation is constrained to the fields' JSON schema and capped at the
+    tokens that schema can need, which also leaves more context for text.
+    """
+    options = generation_options(fields)
+    schema = json_schema(fields)
+    overhead = estimate_tokens(build_prompt(""))
+    budget = settings.LLM_CONTEXT_TOKENS - options["num_predict"] - overhead
+    chunks = await asyncio.to_thread(chunk_pages, pages, budget)
+    if not chunks:
+        raise HTTPException(status_code=400, detail="Document has no extracted text.")
+
+    print(f"🧩 Extracting {len(fields)} fields from {len(chunks)} chunk(s) of ≤{budget} tokens")
+
+    responses = await asyncio.gather(
+        *(
+            call_ollama_async(build_prompt(c["text"]), options=options, use_cache=use_cache, format=schema)
+            for c in chunks
+        ),
+        return_exceptions=True
+    )
+
+    # Parsing and merging are CPU work: keep them off the event loop
+    return await asyncio.to_thread(_reduce_responses, chunks, responses, fields)
+
+
+def _reduce_responses(chunks: list[dict], responses: list, fields: list[str]) -> tuple[dict, dict]:
+    results = []
+    errors = []
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, Exception):
+            errors.append(response)
+            print(f"❌ Chunk (pages {chunk['pages'][0]}-{chunk['pages'][-1]}) failed: {response}")
+            continue
+        try:
+            data, failed = parse_ai_fields(response, fields)
+            if failed:
+                # Failed fields count as empty for this chunk; other chunks can still supply them
+                print(f"⚠️ Chunk (pages {chunk['pages'][0]}-{chunk['pages'][-1]}) failed fields: {', '.join(failed)}")
+            results.append((chunk, data))
+        except ValueError as e:
+            print(f"⚠️ Chunk (pages {chunk['pages'][0]}-{chunk['pages'][-1]}) returned invalid JSON: {e}")
+
+    if not results:
+        if errors:
+            raise errors[0]
+        raise HTTPException(status_code=500, detail="AI returned invalid JSON.")
+
+    return merge_chunk_results(results, fields)
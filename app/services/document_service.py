@@ -1,86 +1,278 @@
 import os
+import json
 import uuid
-import shutil
+import asyncio
+import base64
+import hashlib
+from typing import Optional
 from fastapi import UploadFile, HTTPException
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
 from datetime import datetime
+from app.core.database import engine
 from app.models.document import Document
-from app.models.fund import Fund
-from app.models.company import Company
-from app.services.ollama_service import call_ollama
-from app.utils.json_parser import parse_ai_json
-from app.utils.pdf_extractor import extract_preview_text
-from app.utils.prompt_builder import build_fund_company_prompt
+from app.models.page_text import PageText
+from app.core.config import settings
+from app.core.storage import get_storage, shard_key
+from app.services.ollama_service import call_ollama_async
+from app.services.entity_index import detect_entities
+from app.services.entity_store import upsert_entity
+from app.utils.json_parser import parse_ai_fields
+from app.utils.pdf_extractor import extract_stored_preview_text
+from app.utils.extraction_cache import get_cached_extraction
+from app.utils.extraction_schema import json_schema, generation_options
+from app.utils.prompt_builder import FUND_COMPANY_FIELDS, build_fund_company_prompt
 
-UPLOAD_DIR = "pdf_samples"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+class UploadWriter:
+    """
+    Writes an upload to a temp file chunk by chunk while hashing it,
+    checking the PDF header on the first bytes and enforcing
+    MAX_UPLOAD_BYTES as soon as it is exceeded.
+    """
 
-def save_document_to_db(file: UploadFile, session: Session) -> Document:
-    """Upload PDF → detect Fund/Company via AI → save Document with relationships."""
+    def __init__(self):
+        self.sha = hashlib.sha256()
+        self.size = 0
+        self.tmp_path = os.path.join(get_storage().tmp_dir(), f"{uuid.uuid4()}.part")
+        self.buffer = open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes):
+        if self.size == 0 and b"%PDF-" not in chunk[:1024]:
+            raise HTTPException(status_code=400, detail="File is not a valid PDF.")
+        self.size += len(chunk)
+        if self.size > settings.MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File exceeds the {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit."
+            )
+        self.sha.update(chunk)
+        self.buffer.write(chunk)
+
+    def finish(self) -> tuple[str, str]:
+        """Put the temp file into storage under its sharded content key; returns (content_hash, key)."""
+        self.buffer.close()
+        if self.size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+
+        content_hash = self.sha.hexdigest()
+        key = shard_key(content_hash)
+        storage = get_storage()
+        if storage.exists(key):
+            os.remove(self.tmp_path)
+        else:
+            storage.put_file(self.tmp_path, key)
+        return content_hash, key
+
+    def abort(self):
+        self.buffer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def store_upload(fileobj) -> tuple[str, str]:
+    """
+    Stream a binary file object to storage while hashing it, and store it
+    under its content hash so identical reports share a single object.
+    Returns (content_hash, storage_key).
+    """
+    writer = UploadWriter()
+    try:
+        while chunk := fileobj.read(settings.UPLOAD_CHUNK_SIZE):
+            writer.write(chunk)
+        return writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+
+
+async def store_upload_async(file: UploadFile) -> tuple[str, str]:
+    """
+    Async version of store_upload for request handlers: chunks are read from
+    the upload without blocking the event loop, and oversized files are
+    rejected before any bytes are read when the client declared a size.
+    """
+    if file.size is not None and file.size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds the {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit."
+        )
+
+    writer = UploadWriter()
+    try:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+            await asyncio.to_thread(writer.write, chunk)
+        return await asyncio.to_thread(writer.finish)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def preview_from_cache(content_hash: str, max_pages: int = 2):
+    """Preview text from already-extracted pages, or None if the PDF was never parsed."""
+    cached = get_cached_extraction(content_hash)
+    if cached is None:
+        return None
+    return "\n".join(p["text"] for p in cached["pages"][:max_pages]).strip()
+
+
+async def save_document_to_db(file: UploadFile, session: Session) -> Document:
+    """Upload PDF → detect Fund/Company (name index, AI fallback) → save Document with relationships."""
 
     # Step 1: Validate file type
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
 
-    # Step 2: Save to disk
-    file_id = str(uuid.uuid4())
-    saved_file_path = os.path.join(UPLOAD_DIR, f"{file_id}_{file.filename}")
-    with open(saved_file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Step 2: Save to storage (deduplicated by content hash)
+    file_id = uuid.uuid4()
+    content_hash, storage_key = await store_upload_async(file)
 
-    # Step 3: Extract short text preview for AI
-    preview_text = extract_preview_text(saved_file_path)
+    # Re-upload of a known report: reuse its fund/company links, no parse or LLM call
+    previous = await asyncio.to_thread(_find_by_content_hash, content_hash, session)
+    if previous:
+        return await asyncio.to_thread(
+            _insert_document, session,
+            id=file_id,
+            file_name=file.filename,
+            file_path=storage_key,
+            content_hash=content_hash,
+            fund_id=previous.fund_id,
+            company_id=previous.company_id,
+        )
 
-    # Step 4: Ask Ollama AI to identify fund & company names
-    prompt = build_fund_company_prompt(preview_text)
-    ai_response = call_ollama(prompt)
-    print("\n=== AI RAW FUND/COMPANY RESPONSE ===\n", ai_response, "\n===================================\n")
+    # Step 3: Extract short text preview for AI
+    preview_text = await asyncio.to_thread(preview_from_cache, content_hash)
+    if preview_text is None:
+        preview_text = await asyncio.to_thread(extract_stored_preview_text, storage_key)
 
-    try:
-        names = parse_ai_json(ai_response)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI JSON parse error: {e}")
+    # Step 4: Resolve fund & company from the preview with the in-memory name index
+    matches = await asyncio.to_thread(detect_entities, preview_text, session)
 
-    fund_name = names.get("fund_name") or "Unknown Fund"
-    company_name = names.get("company_name") or "Unknown Company"
+    # Step 5: Ask Ollama AI only when the index has no confident match
+    names = {}
+    if matches["fund"] is None or matches["company"] is None:
+        prompt = build_fund_company_prompt(preview_text)
+        ai_response = await call_ollama_async(
+            prompt, options=generation_options(FUND_COMPANY_FIELDS), format=json_schema(FUND_COMPANY_FIELDS)
+        )
+        print("\n=== AI RAW FUND/COMPANY RESPONSE ===\n", ai_response, "\n===================================\n")
 
-    # Step 5: Upsert Fund
-    existing_fund = session.exec(select(Fund).where(Fund.name == fund_name)).first()
-    if existing_fund:
-        fund = existing_fund
+        try:
+            names, failed = parse_ai_fields(ai_response, FUND_COMPANY_FIELDS)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"AI JSON parse error: {e}")
+        if failed:
+            print(f"⚠️ Fund/company detection failed fields: {', '.join(failed)}")
     else:
-        fund = Fund(name=fund_name, type="Private Equity")
-        session.add(fund)
-        session.commit()
-        session.refresh(fund)
-
-    # Step 6: Upsert Company
-    existing_company = session.exec(select(Company).where(Company.name == company_name)).first()
-    if existing_company:
-        company = existing_company
-    else:
-        company = Company(name=company_name, description="Detected from uploaded document")
-        session.add(company)
-        session.commit()
-        session.refresh(company)
+        print(f"🔎 Fund/company resolved from preview: {matches['fund'][1]} / {matches['company'][1]}")
 
-    # Step 7: Create Document record
-    document = Document(
+    # Step 6: Get or create Fund and Company (upsert) and create the Document, in one commit
+    return await asyncio.to_thread(
+        _save_detected_document, session,
+        matches=matches,
+        names=names,
         id=file_id,
         file_name=file.filename,
-        file_path=saved_file_path,
-        uploaded_at=datetime.utcnow(),
-        fund_id=fund.id,
-        company_id=company.id,
+        file_path=storage_key,
+        content_hash=content_hash,
     )
 
+
+# Database steps of the upload, run in a worker thread (the session is used by one thread at a time)
+
+def _find_by_content_hash(content_hash: str, session: Session) -> Document:
+    return session.exec(select(Document).where(Document.content_hash == content_hash)).first()
+
+
+def _insert_document(session: Session, **fields) -> Document:
+    document = Document(uploaded_at=datetime.utcnow(), **fields)
     session.add(document)
     session.commit()
     session.refresh(document)
-
     return document
 
-def list_all_documents(session: Session):
-    """Retrieve all uploaded documents."""
-    from app.models.document import Document
-    return session.query(Document).all()
\ No newline at end of file
+
+def _save_detected_document(session: Session, matches: dict, names: dict, **fields) -> Document:
+    """Upsert the fund/company the index could not match, then insert the document in the same commit."""
+    fund_id = (
+        matches["fund"][0] if matches["fund"]
+        else upsert_entity("fund", names.get("fund_name") or "Unknown Fund", session)
+    )
+    company_id = (
+        matches["company"][0] if matches["company"]
+        else upsert_entity("company", names.get("company_name") or "Unknown Company", session)
+    )
+    return _insert_document(session, fund_id=fund_id, company_id=company_id, **fields)
+
+
+def encode_cursor(document: Document) -> str:
+    raw = f"{document.uploaded_at.isoformat()}|{document.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        uploaded_at, document_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(uploaded_at), uuid.UUID(document_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def list_documents_page(
+    session: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fund_id: Optional[uuid.UUID] = None,
+    company_id: Optional[uuid.UUID] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None
+) -> tuple[list[Document], Optional[str]]:
+    """
+    Keyset-paginated documents, newest first, ordered by (uploaded_at, id).
+    Returns (documents, next_cursor); next_cursor is None on the last page.
+    """
+    statement = select(Document)
+    if fund_id:
+        statement = statement.where(Document.fund_id == fund_id)
+    if company_id:
+        statement = statement.where(Document.company_id == company_id)
+    if uploaded_from:
+        statement = statement.where(Document.uploaded_at >= uploaded_from)
+    if uploaded_to:
+        statement = statement.where(Document.uploaded_at < uploaded_to)
+    if cursor:
+        after_uploaded_at, after_id = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(Document.uploaded_at, Document.id) < tuple_(after_uploaded_at, after_id)
+        )
+
+    statement = statement.order_by(Document.uploaded_at.desc(), Document.id.desc()).limit(limit + 1)
+    documents = session.exec(statement).all()
+
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    return documents[:limit], next_cursor
+
+
+def iter_page_texts(document_id: uuid.UUID, from_page: Optional[int] = None, to_page: Optional[int] = None):
+    """
+    Yield page text as NDJSON lines, streaming rows from the database so
+    multi-MB documents are never held in memory. Uses its own session
+    because it runs after the request's session has been closed.
+    """
+    statement = select(
+        PageText.page_number,
+        PageText.text,
+        PageText.extraction_method
+    ).where(PageText.document_id == document_id)
+    if from_page is not None:
+        statement = statement.where(PageText.page_number >= from_page)
+    if to_page is not None:
+        statement = statement.where(PageText.page_number <= to_page)
+    statement = statement.order_by(PageText.page_number).execution_options(yield_per=100)
+
+    with Session(engine) as session:
+        for page_number, text, method in session.exec(statement):
+            yield json.dumps({
+                "page_number": page_number,
+                "extraction_method": method,
+                "text": text or ""
+            }) + "\n"
\ No newline at end of file
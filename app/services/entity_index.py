@@ -0,0 +1,233 @@
+# app/services/entity_index.py
+
+import re
+import math
+import time
+from collections import defaultdict
+from typing import Optional
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.fund import Fund
+from app.models.company import Company
+
+ENTITY_MODELS = {"fund": Fund, "company": Company}
+
+# Placeholders written when detection fails; never match them against text
+PLACEHOLDER_NAMES = {"unknown fund", "unknown company"}
+
+LEGAL_SUFFIXES = {
+    "ltd", "limited", "inc", "incorporated", "llc", "llp", "lp", "plc", "co", "corp",
+    "corporation", "company", "gmbh", "ag", "sa", "sas", "bv", "nv", "pte", "pty", "spa", "ab", "kk",
+}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+PARENTHETICAL_RE = re.compile(r"\(([^)]*)\)")
+# Numbers and roman numerals up to XXXIX: fund vintages, series, years
+IDENTIFIER_RE = re.compile(r"\d+|x{0,3}(ix|iv|v?i{0,3})")
+
+MIN_ALIAS_CHARS = 5  # shorter aliases ("ABC") match too much unrelated text
+MAX_ALIAS_TOKENS = 8
+AMBIGUITY_MARGIN = 0.05  # a runner-up this close to the best fuzzy score makes the match ambiguous
+
+
+def _tokens(text: str) -> list[str]:
+    text = text.lower().replace("&", " and ")
+    tokens = []
+    initials = False  # last token was a single letter followed by "."
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if len(token) == 1 and token.isalpha():
+            if initials:
+                # "L.P." / "S.A." → "lp" / "sa"; "Fund I L.P." keeps the "i"
+                tokens[-1] += token
+            else:
+                tokens.append(token)
+            initials = text.startswith(".", match.end())
+            continue
+        initials = False
+        tokens.append(token)
+    return tokens
+
+
+def _identifiers(alias: str) -> tuple[str, ...]:
+    """Number and roman-numeral tokens, which must match exactly ("Fund II" is not "Fund III")."""
+    return tuple(t for t in alias.split() if IDENTIFIER_RE.fullmatch(t))
+
+
+def normalize_name(name: str) -> str:
+    """'Samsung Electronics Co., Ltd.' → 'samsung electronics' (case, punctuation and legal suffixes dropped)."""
+    tokens = _tokens(PARENTHETICAL_RE.sub(" ", name or ""))
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def name_aliases(name: str) -> set[str]:
+    """Token strings a name may appear as in text: full form, normalized form, and a parenthetical short name."""
+    aliases = {" ".join(_tokens(PARENTHETICAL_RE.sub(" ", name))), normalize_name(name)}
+    for short in PARENTHETICAL_RE.findall(name):
+        aliases.add(" ".join(_tokens(short)))
+    return {a for a in aliases if len(a) >= MIN_ALIAS_CHARS and len(a.split()) <= MAX_ALIAS_TOKENS}
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    In-memory lookup from names seen in text to entity ids: exact alias
+    matches over token n-grams first, then trigram (Jaccard) fuzzy matches
+    against aliases of the same token length. Only multi-token aliases are
+    searched for in free text ("apple" in a recipe is not Apple Inc.);
+    anything uncertain is left unmatched for the LLM fallback.
+    """
+
+    def __init__(self):
+        self.loaded_at = time.monotonic()
+        self.names: dict = {}  # entity id → name
+        self.aliases: dict[str, set] = defaultdict(set)  # alias → entity ids
+        self.alias_trigrams: dict[str, set] = {}
+        self.alias_identifiers: dict[str, tuple] = {}
+        self.postings: dict[int, dict[str, set]] = defaultdict(lambda: defaultdict(set))  # tokens → trigram → aliases
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, entity_id, name: str):
+        if not name or " ".join(_tokens(name)) in PLACEHOLDER_NAMES:
+            return
+        self.names[entity_id] = name
+        for alias in name_aliases(name):
+            self.aliases[alias].add(entity_id)
+            size = len(alias.split())
+            if size > 1 and alias not in self.alias_trigrams:
+                trigrams = _trigrams(alias)
+                self.alias_trigrams[alias] = trigrams
+                self.alias_identifiers[alias] = _identifiers(alias)
+                for trigram in trigrams:
+                    self.postings[size][trigram].add(alias)
+
+    def _resolve(self, alias: str):
+        ids = self.aliases[alias]
+        # An alias shared by several entities is ambiguous
+        return next(iter(ids)) if len(ids) == 1 else None
+
+    def _fuzzy(self, candidate: str, threshold: float) -> Optional[tuple[str, float]]:
+        """
+        (alias, score) of the closest multi-token alias, or None when nothing
+        reaches the threshold or an alias of another entity scores within
+        AMBIGUITY_MARGIN of the best one.
+        """
+        postings = self.postings.get(len(candidate.split()))
+        if not postings:
+            return None
+        trigrams = _trigrams(candidate)
+        identifiers = _identifiers(candidate)
+        # Jaccard >= t needs at least ceil(t * n) shared trigrams, so any match
+        # shares one of the n - ceil(t * n) + 1 rarest: probe only those
+        # (prefix filtering) and score the few aliases they point at.
+        needed = math.ceil(threshold * len(trigrams))
+        rarest = sorted(trigrams, key=lambda t: len(postings.get(t, ())))[:len(trigrams) - needed + 1]
+        candidates = set().union(*(postings.get(t, ()) for t in rarest))
+        scored = []
+        for alias in candidates:
+            alias_trigrams = self.alias_trigrams[alias]
+            if self.alias_identifiers[alias] != identifiers:
+                continue
+            count = len(trigrams & alias_trigrams)
+            score = count / (len(trigrams) + len(alias_trigrams) - count)
+            if score >= threshold:
+                scored.append((score, alias))
+        if not scored:
+            return None
+        scored.sort(reverse=True)
+        score, alias = scored[0]
+        for runner_score, runner in scored[1:]:
+            if score - runner_score > AMBIGUITY_MARGIN:
+                break
+            if self.aliases[runner] != self.aliases[alias]:
+                return None
+        return alias, score
+
+    def match_name(self, name: str, threshold: Optional[float] = None) -> Optional[tuple]:
+        """(entity_id, name, score) of the entity a detected name refers to, or None."""
+        threshold = threshold or settings.ENTITY_MATCH_THRESHOLD
+        for alias in sorted(name_aliases(name), key=len, reverse=True):
+            if alias in self.aliases and (entity_id := self._resolve(alias)):
+                return entity_id, self.names[entity_id], 1.0
+        normalized = normalize_name(name)
+        if len(normalized) >= MIN_ALIAS_CHARS and (found := self._fuzzy(normalized, threshold)):
+            alias, score = found
+            if entity_id := self._resolve(alias):
+                return entity_id, self.names[entity_id], round(score, 3)
+        return None
+
+    def match_text(self, text: str, threshold: Optional[float] = None) -> Optional[tuple]:
+        """
+        (entity_id, name, score) of the entity mentioned earliest in the text.
+        Exact alias hits win over fuzzy ones; at the same position the longer alias wins.
+        """
+        if not self.names:
+            return None
+        threshold = threshold or settings.ENTITY_MATCH_THRESHOLD
+        tokens = _tokens(text)
+        lengths = sorted(self.postings, reverse=True)
+
+        for fuzzy in (False, True):
+            for start in range(len(tokens)):
+                for length in lengths:
+                    if start + length > len(tokens):
+                        continue
+                    window = " ".join(tokens[start:start + length])
+                    if len(window) < MIN_ALIAS_CHARS:
+                        continue
+                    if not fuzzy:
+                        if window in self.aliases and (entity_id := self._resolve(window)):
+                            return entity_id, self.names[entity_id], 1.0
+                    elif found := self._fuzzy(window, threshold):
+                        alias, score = found
+                        entity_id = self._resolve(alias)
+                        # The earliest fuzzy mention is ambiguous: leave it to the LLM
+                        return (entity_id, self.names[entity_id], round(score, 3)) if entity_id else None
+        return None
+
+
+# ==========================================================
+#  Process-local indexes (one per entity kind)
+# ==========================================================
+
+_indexes: dict[str, NameIndex] = {}
+
+def get_name_index(kind: str, session: Session) -> NameIndex:
+    """
+    The index for "fund" or "company", loaded on first use. Entities created
+    in this process are added on commit (register_entity); a reload every
+    ENTITY_INDEX_TTL_SECONDS picks up those inserted by other processes.
+    """
+    index = _indexes.get(kind)
+    if index is None or time.monotonic() - index.loaded_at > settings.ENTITY_INDEX_TTL_SECONDS:
+        model = ENTITY_MODELS[kind]
+        index = NameIndex()
+        for entity_id, name in session.exec(select(model.id, model.name)):
+            index.add(entity_id, name)
+        _indexes[kind] = index
+    return index
+
+
+def register_entity(kind: str, entity_id, name: str):
+    """Add a newly inserted fund/company to the loaded index, if any."""
+    index = _indexes.get(kind)
+    if index is not None:
+        index.add(entity_id, name)
+
+
+def detect_entities(text: str, session: Session) -> dict:
+    """
+    {"fund": match, "company": match} from preview text; a match is (id, name, score) or None.
+    CPU-bound on large indexes: call it through asyncio.to_thread from async code.
+    """
+    return {kind: get_name_index(kind, session).match_text(text) for kind in ENTITY_MODELS}
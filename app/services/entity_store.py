@@ -0,0 +1,90 @@
+# app/services/entity_store.py
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from app.services.entity_index import ENTITY_MODELS, get_name_index, normalize_name, register_entity
+
+# Columns filled in when a fund/company is first created from a detected name
+ENTITY_DEFAULTS = {
+    "fund": {"type": "Private Equity"},
+    "company": {"description": "Detected from uploaded document"},
+}
+
+INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# (kind, normalized_name) → entity id, for rows known to be committed
+_entity_ids: dict[tuple[str, str], object] = {}
+
+
+def _insert(session: Session, model):
+    dialect = session.get_bind().dialect.name
+    if dialect not in INSERTS:
+        raise RuntimeError(f"Entity upsert needs INSERT ... ON CONFLICT (postgresql or sqlite), not {dialect}.")
+    return INSERTS[dialect](model.__table__)
+
+
+def upsert_entities(kind: str, names: list[str], session: Session) -> dict[str, object]:
+    """
+    Map detected names to fund/company ids, creating missing rows with one
+    INSERT ... ON CONFLICT (normalized_name) DO NOTHING and reading the ids
+    back in the same transaction, so concurrent uploads of the same entity
+    converge on one row. Names the name index recognises (aliases, fuzzy)
+    reuse the existing entity. Caller commits.
+    """
+    model = ENTITY_MODELS[kind]
+    ids, keys = {}, {}
+    index = None
+    for name in set(names):
+        key = normalize_name(name)
+        if (kind, key) in _entity_ids:
+            ids[name] = _entity_ids[(kind, key)]
+            continue
+        index = index or get_name_index(kind, session)
+        if match := index.match_name(name):
+            ids[name] = match[0]
+        else:
+            keys[name] = key
+    if not keys:
+        return ids
+
+    # One row per key: "Acme Ltd" and "Acme Limited" are the same entity
+    first_names = {key: name for name, key in reversed(list(keys.items()))}
+    rows = [
+        model(name=name, normalized_name=key, **ENTITY_DEFAULTS[kind]).model_dump()
+        for key, name in first_names.items()
+    ]
+    session.execute(_insert(session, model).values(rows).on_conflict_do_nothing(index_elements=["normalized_name"]))
+
+    found = session.exec(
+        select(model.normalized_name, model.id, model.name).where(model.normalized_name.in_(list(first_names)))
+    )
+    by_key = {key: (entity_id, name) for key, entity_id, name in found}
+    pending = session.info.setdefault("pending_entities", [])
+    for name, key in keys.items():
+        entity_id, stored_name = by_key[key]
+        ids[name] = entity_id
+        pending.append((kind, key, entity_id, stored_name))
+    return ids
+
+
+def upsert_entity(kind: str, name: str, session: Session):
+    """Single-name upsert_entities; returns the id. Caller commits."""
+    return upsert_entities(kind, [name], session)[name]
+
+
+# Ids (and index entries) are only published once the transaction that
+# created or read them has committed; a rollback discards them.
+
+@event.listens_for(ORMSession, "after_commit")
+def _publish_entities(session):
+    for kind, key, entity_id, name in session.info.pop("pending_entities", []):
+        _entity_ids[(kind, key)] = entity_id
+        register_entity(kind, entity_id, name)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def _discard_entities(session):
+    session.info.pop("pending_entities", None)
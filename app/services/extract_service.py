@@ -1,167 +1,541 @@
 # app/services/extract_service.py
 
 import json
-import pdfplumber
+import asyncio
+import hashlib
+from functools import partial
 from fastapi import HTTPException
-from sqlmodel import Session
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import update, delete
+from sqlmodel import Session, select
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.database import bulk_insert
 from app.models.document import Document
 from app.models.extracted_field import ExtractedField
+from app.models.correction import Correction
+from app.models.extracted_table import ExtractedTable
+from app.models.page_text import PageText
 from app.models.company import Company
 from app.models.investment import Investment
 from app.models.financial import FinancialHighlight
+from app.models.extraction_run import ExtractionRun
 
-from app.services.ollama_service import call_ollama
-from app.utils.cleaner import extract_number
-from app.utils.json_parser import parse_ai_json
+from app.services.chunked_extraction import run_chunked_extraction, is_empty
+from app.services.entity_store import upsert_entity
+from app.services.rule_extraction import extract_financials_by_rules
+from app.utils.cleaner import normalize_numbers, parse_currency_label, rescale, absolute_value
+from app.utils.page_index import select_relevant_pages, pages_fingerprint
 from app.utils.prompt_builder import (
+    COMPANY_FIELDS,
+    FINANCIAL_FIELDS,
+    COMPANY_FIELD_QUERIES,
+    FINANCIAL_FIELD_QUERIES,
     build_company_prompt,
     build_financial_prompt
 )
 
 # ==========================================================
-#  1. Basic PDF Text Extraction
+#  1. Stored page text and tables
 # ==========================================================
 
-def extract_text_from_document(document_id: str, session: Session):
-    document = session.get(Document, document_id)
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found.")
+def text_fingerprint(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def sync_page_texts(document: Document, pages: list[dict], session: Session) -> dict:
+    """
+    Make the document's page_text rows match the freshly extracted pages:
+    unchanged pages (same fingerprint) are skipped, changed pages are updated
+    in place, new pages are inserted and pages that no longer exist are deleted.
+    """
+    existing = session.exec(
+        select(PageText).where(PageText.document_id == document.id)
+    ).all()
+    by_page = {row.page_number: row for row in existing}
+
+    now = datetime.utcnow()
+    inserts, updates, unchanged = [], [], 0
+    for page in pages:
+        fingerprint = text_fingerprint(page["text"])
+        row = by_page.pop(page["page_number"], None)
+        if row is None:
+            inserts.append({
+                "document_id": document.id,
+                "page_number": page["page_number"],
+                "text": page["text"],
+                "extraction_method": page["method"],
+                "content_hash": fingerprint,
+                "created_at": now
+            })
+        elif (row.content_hash or text_fingerprint(row.text)) == fingerprint:
+            unchanged += 1
+        else:
+            updates.append({
+                "id": row.id,
+                "text": page["text"],
+                "extraction_method": page["method"],
+                "content_hash": fingerprint,
+                "created_at": now
+            })
+
+    # Pages left in by_page no longer exist in the PDF
+    stale = list(by_page.values())
+    if stale:
+        session.execute(delete(PageText).where(PageText.id.in_([row.id for row in stale])))
+
+    bulk_insert(session, PageText, inserts)
+    if updates:
+        session.execute(update(PageText), updates)
+    session.commit()
+
+    return {
+        "pages": len(pages),
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "unchanged": unchanged,
+        "deleted": len(stale)
+    }
 
-    try:
-        with pdfplumber.open(document.file_path) as pdf:
-            for page_number, page in enumerate(pdf.pages, start=1):
-                text = page.extract_text() or ""
 
-                extracted = ExtractedField(
-                    document_id=document.id,
-                    field_name="raw_text",
-                    extracted_value=text,
-                    page_number=page_number,
-                    source_text=text,
-                    confidence_score=None,
-                    created_at=datetime.utcnow()
-                )
-                session.add(extracted)
+def sync_document_tables(document: Document, tables: list[dict], session: Session) -> int:
+    """
+    Replace the document's stored tables with the freshly extracted ones.
+    Skipped when the tables are identical (re-extraction of the same PDF).
+    Returns the number of tables stored.
+    """
+    existing = session.exec(
+        select(ExtractedTable).where(ExtractedTable.document_id == document.id)
+        .order_by(ExtractedTable.page_number, ExtractedTable.table_index)
+    ).all()
+    current = [(t.page_number, t.table_index, json.loads(t.rows)) for t in existing]
+    fresh = [(t["page_number"], t["table_index"], t["rows"]) for t in tables]
+    if current == fresh:
+        return len(tables)
+
+    now = datetime.utcnow()
+    session.execute(delete(ExtractedTable).where(ExtractedTable.document_id == document.id))
+    bulk_insert(session, ExtractedTable, [
+        {
+            "document_id": document.id,
+            "page_number": t["page_number"],
+            "table_index": t["table_index"],
+            "flavor": t["flavor"],
+            "n_rows": t["n_rows"],
+            "n_cols": t["n_cols"],
+            "rows": json.dumps(t["rows"]),
+            "accuracy": t.get("accuracy"),
+            "created_at": now
+        }
+        for t in tables
+    ])
+    session.commit()
+    return len(tables)
+
+
+def load_tables(document_id: str, session: Session) -> list[dict]:
+    """Structured tables of the document, in page order, with rows decoded."""
+    tables = session.exec(
+        select(ExtractedTable).where(ExtractedTable.document_id == document_id)
+        .order_by(ExtractedTable.page_number, ExtractedTable.table_index)
+    ).all()
+    return [
+        {
+            "page_number": t.page_number,
+            "table_index": t.table_index,
+            "flavor": t.flavor,
+            "n_rows": t.n_rows,
+            "n_cols": t.n_cols,
+            "accuracy": t.accuracy,
+            "rows": json.loads(t.rows)
+        }
+        for t in tables
+    ]
+
+
+def load_page_texts(document_id: str, session: Session, page_numbers: list[int] = None) -> list[tuple[int, str]]:
+    """(page_number, text) for every extracted page of the document (or just page_numbers), in page order."""
+    statement = select(PageText.page_number, PageText.text).where(PageText.document_id == document_id)
+    if page_numbers is not None:
+        statement = statement.where(PageText.page_number.in_(page_numbers))
+    rows = session.exec(statement.order_by(PageText.page_number)).all()
+    return [(page_number, text or "") for page_number, text in rows]
 
-            session.commit()
-            return len(pdf.pages)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading PDF: {e}")
+def load_page_hashes(document_id: str, session: Session) -> list[tuple[int, str]]:
+    """(page_number, content_hash) for every extracted page, in page order — enough to fingerprint the pages."""
+    rows = session.exec(
+        select(PageText.page_number, PageText.content_hash)
+        .where(PageText.document_id == document_id)
+        .order_by(PageText.page_number)
+    ).all()
+    return [(page_number, content_hash or "") for page_number, content_hash in rows]
+
+
+def save_field_provenance(document: Document, data: dict, provenance: dict, session: Session):
+    """
+    Record each extracted value with its page, confidence and the path that
+    produced it ("table", "regex" or "llm"), replacing the document's rows
+    from earlier runs for the same fields so a re-extraction does not stack
+    duplicates. Rows a correction points at are kept. Caller commits.
+    """
+    fields = set(data) | set(provenance)
+    if fields:
+        session.execute(
+            delete(ExtractedField).where(
+                ExtractedField.document_id == document.id,
+                ExtractedField.field_name.in_(fields),
+                ExtractedField.id.not_in(select(Correction.extracted_field_id))
+            )
+        )
+    now = datetime.utcnow()
+    bulk_insert(session, ExtractedField, [
+        {
+            "document_id": document.id,
+            "field_name": field_name,
+            "extracted_value": str(data.get(field_name)),
+            "page_number": source["page_number"],
+            "extraction_method": source.get("method", "llm"),
+            "confidence_score": source["confidence"],
+            "created_at": now
+        }
+        for field_name, source in provenance.items()
+    ])
 
 
 # ==========================================================
-# 2. Company + Investment Extraction (AI)
+# 2. Shared AI helpers
 # ==========================================================
 
-def extract_company_data_ai(document_id: str, session: Session):
+def _run_fingerprint(*page_sets: list, tables: list[dict] = None) -> str:
+    """
+    Identifies an AI run's input: the pages it was given, the model, and for
+    financial runs the stored tables the rule pass reads (so re-extracted or
+    backfilled tables invalidate the previous result).
+    """
+    tables_digest = text_fingerprint(json.dumps(tables, sort_keys=True)) if tables is not None else ""
+    return text_fingerprint(
+        settings.OLLAMA_MODEL + "".join(pages_fingerprint(pages) for pages in page_sets) + tables_digest
+    )
+
+
+def _previous_run(document: Document, kind: str, fingerprint: str, session: Session):
+    """Stored result of the latest run of this kind, if its input is unchanged."""
+    run = session.exec(
+        select(ExtractionRun).where(
+            ExtractionRun.document_id == document.id,
+            ExtractionRun.kind == kind
+        ).order_by(ExtractionRun.created_at.desc())
+    ).first()
+    if run and run.input_fingerprint == fingerprint and run.result:
+        print(f"⏭️ {kind} input unchanged for document {document.id} — reusing previous result")
+        result = json.loads(run.result)
+        result["skipped"] = True
+        return result
+    return None
+
+
+def _record_run(document: Document, kind: str, fingerprint: str, result: dict, session: Session):
+    """Stage the run record alongside the extracted rows (caller commits)."""
+    session.add(ExtractionRun(
+        document_id=document.id,
+        kind=kind,
+        input_fingerprint=fingerprint,
+        result=json.dumps(jsonable_encoder(result))
+    ))
+
+def _load_document_pages(document_id: str, session: Session, missing_detail: str):
     document = session.get(Document, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found.")
 
-    raw_pages = session.query(ExtractedField).filter(
-        ExtractedField.document_id == document_id
-    ).order_by(ExtractedField.page_number).all()
+    page_hashes = load_page_hashes(document_id, session)
+    if not page_hashes:
+        raise HTTPException(status_code=400, detail=missing_detail)
+    return document, page_hashes
+
+
+def _select_pages(document: Document, page_hashes: list, field_queries: dict, session: Session, **kw) -> list:
+    """(page_number, text) of the relevant pages; only those pages' text is read unless the index is rebuilt."""
+    page_numbers = select_relevant_pages(
+        document.id, page_hashes, field_queries, partial(load_page_texts, document.id, session), **kw
+    )
+    return load_page_texts(document.id, session, page_numbers)
+
 
-    if not raw_pages:
-        raise HTTPException(status_code=400, detail="Run /extract/pdf first to extract text.")
+def _select_company_pages(document: Document, page_hashes: list, session: Session) -> list:
+    # Company identity is usually introduced on the first page
+    return _select_pages(document, page_hashes, COMPANY_FIELD_QUERIES, session, always_include=(1,))
 
-    full_text = "\n".join([p.extracted_value or "" for p in raw_pages])
-    prompt = build_company_prompt(full_text)
-    ai_response = call_ollama(prompt)
-    print("\n\n=== RAW AI RESPONSE ===\n", ai_response, "\n=======================\n")
 
-    data = parse_ai_json(ai_response)
+def _select_financial_pages(document: Document, page_hashes: list, session: Session) -> list:
+    return _select_pages(document, page_hashes, FINANCIAL_FIELD_QUERIES, session)
 
-    company = Company(
-        name=data.get("company_name"),
-        holding_company=data.get("holding_company"),
-        description=data.get("business_description"),
-        head_office_location=data.get("head_office_location")
+
+async def _extract_company_fields(pages: list, use_cache: bool):
+    data, provenance = await run_chunked_extraction(
+        pages, build_company_prompt, COMPANY_FIELDS, use_cache=use_cache
+    )
+    print("\n\n=== MERGED AI RESPONSE ===\n", data, "\n=======================\n")
+    return data, provenance
+
+
+async def _extract_financial_fields(pages: list, tables: list, use_cache: bool):
+    """
+    Rule-based pass over the document's tables and page text first; the LLM
+    is only asked for the fields it could not resolve (and not at all when
+    every field was found).
+    """
+    data, provenance = await asyncio.to_thread(extract_financials_by_rules, tables, pages)
+    missing = [f for f in FINANCIAL_FIELDS if is_empty(data.get(f))]
+    print(f"📐 Rules resolved {len(FINANCIAL_FIELDS) - len(missing)}/{len(FINANCIAL_FIELDS)} financial fields")
+    if not missing:
+        return data, provenance
+
+    llm_data, llm_provenance = await run_chunked_extraction(
+        pages, partial(build_financial_prompt, fields=missing), missing, use_cache=use_cache
     )
+    print("\n\n=== MERGED AI FINANCIAL RESPONSE ===\n", llm_data, "\n=======================\n")
+    for field in missing:
+        data[field] = llm_data.get(field)
+        if field in llm_provenance:
+            provenance[field] = {**llm_provenance[field], "method": "llm"}
+    return data, provenance
+
+
+# Company column → extracted field
+COMPANY_DETAIL_FIELDS = {
+    "holding_company": "holding_company",
+    "description": "business_description",
+    "head_office_location": "head_office_location",
+}
+INVESTMENT_AMOUNT_FIELDS = ["transaction_value", "current_cost", "fair_value"]
+FINANCIAL_AMOUNT_FIELDS = ["revenue", "ebitda", "ebit", "net_profit_after_tax", "capex", "net_debt"]
+FINANCIAL_RATIO_FIELDS = ["ebitda_margin", "ebit_margin"]
+
+
+def _add_company_records(document: Document, data: dict, session: Session):
+    """
+    Resolve the company through the entity upsert (so a re-extracted name
+    reuses the row created at upload), fill in its extracted details, create
+    or update the Investment row and link the document (caller commits).
+    """
+    company_id = document.company_id
+    if data.get("company_name"):
+        company_id = upsert_entity("company", data["company_name"], session)
+    company = session.get(Company, company_id) if company_id else None
+    if company is None:
+        raise HTTPException(status_code=422, detail="No company name extracted and the document has no company")
+    for column, field in COMPANY_DETAIL_FIELDS.items():
+        if data.get(field):
+            setattr(company, column, data[field])
     session.add(company)
-    session.commit()
-    session.refresh(company)
-
-    fund_id = document.fund_id
-
-    investment = Investment(
-        company_id=company.id,
-        fund_id=fund_id,
-        fund_role=data.get("fund_role"),
-        investment_type=data.get("investment_type"),
-        ownership_percent=extract_number(data.get("ownership_percent")),
-        date_of_first_completion=data.get("first_completion_date"),
-        transaction_value=extract_number(data.get("transaction_value")),
-        current_cost=extract_number(data.get("current_cost")),
-        fair_value=extract_number(data.get("fair_value"))
+
+    ownership, *amounts = normalize_numbers(
+        [data.get("ownership_percent")] + [data.get(f) for f in INVESTMENT_AMOUNT_FIELDS]
     )
+    # Investment has no currency/scale column, so amounts are stored in full units
+    transaction_value, current_cost, fair_value = (absolute_value(a) for a in amounts)
+
+    # One investment per (company, fund): a re-extraction updates it in place
+    investment = session.exec(
+        select(Investment).where(Investment.company_id == company.id, Investment.fund_id == document.fund_id)
+    ).first() or Investment(company_id=company.id, fund_id=document.fund_id)
+    investment.fund_role = data.get("fund_role")
+    investment.investment_type = data.get("investment_type")
+    investment.ownership_percent = float(ownership["value"]) if ownership["value"] is not None else None
+    investment.date_of_first_completion = data.get("first_completion_date")
+    investment.transaction_value = transaction_value
+    investment.current_cost = current_cost
+    investment.fair_value = fair_value
     session.add(investment)
-    session.commit()
-    session.refresh(investment)
 
     # Link document to company
     document.company_id = company.id
     session.add(document)
-    session.commit()
+    return company, investment
 
-    return {
+
+def _add_financial_record(company_id, data: dict, session: Session) -> FinancialHighlight:
+    """
+    Create or update the FinancialHighlight row for the company and period
+    (caller commits). Amounts are expressed in
+    the record's currency scale (e.g. "KRW bn"), taken from the currency field
+    or else from the first amount that states one; margins are kept as stated.
+    """
+    currency, scale = parse_currency_label(data.get("currency"))
+    amounts = dict(zip(FINANCIAL_AMOUNT_FIELDS, normalize_numbers(data.get(f) for f in FINANCIAL_AMOUNT_FIELDS)))
+    ratios = dict(zip(FINANCIAL_RATIO_FIELDS, normalize_numbers(data.get(f) for f in FINANCIAL_RATIO_FIELDS)))
+
+    currency = currency or next((a["currency"] for a in amounts.values() if a["currency"]), None)
+    scale = scale or next((a["scale"] for a in amounts.values() if a["scale"]), None)
+    currency_label = " ".join(part for part in (currency, scale) if part) or data.get("currency")
+
+    # One row per (company, period): a re-extraction updates it in place
+    period = data.get("period")
+    financial = session.exec(
+        select(FinancialHighlight).where(
+            FinancialHighlight.company_id == company_id, FinancialHighlight.period == period
+        )
+    ).first() or FinancialHighlight(company_id=company_id, period=period)
+    financial.currency = currency_label
+    for field, number in amounts.items():
+        setattr(financial, field, rescale(number, scale))
+    for field, number in ratios.items():
+        setattr(financial, field, number["value"])
+    session.add(financial)
+    return financial
+
+
+# ==========================================================
+# 3. Company + Investment Extraction (AI)
+# ==========================================================
+#  The extractors are async only so the Ollama calls can be awaited; every
+#  database, cache and CPU step (page selection, rules, writes) runs in a
+#  worker thread so a job never blocks the event loop. The session is handed
+#  from step to step and never used by two threads at once.
+
+def _prepare_company_run(document_id: str, session: Session, use_cache: bool):
+    document, page_hashes = _load_document_pages(
+        document_id, session, "Run /extract/pdf first to extract text."
+    )
+    pages = _select_company_pages(document, page_hashes, session)
+    fingerprint = _run_fingerprint(pages)
+    previous = _previous_run(document, "company_ai", fingerprint, session) if use_cache else None
+    return document, pages, fingerprint, previous
+
+
+def _save_company_run(document: Document, data: dict, provenance: dict, fingerprint: str, session: Session) -> dict:
+    company, investment = _add_company_records(document, data, session)
+    save_field_provenance(document, data, provenance, session)
+    result = jsonable_encoder({
         "message": "AI extraction completed",
         "company": company,
         "investment": investment,
-        "ai_raw_output": data
-    }
+        "ai_raw_output": data,
+        "provenance": provenance
+    })
+    _record_run(document, "company_ai", fingerprint, result, session)
+    session.commit()
+    return result
+
+
+async def extract_company_data_ai(document_id: str, session: Session, use_cache: bool = True):
+    """
+    Re-running on unchanged input pages returns the previous result without
+    calling the model; use_cache=False forces a fresh run.
+    """
+    document, pages, fingerprint, previous = await asyncio.to_thread(
+        _prepare_company_run, document_id, session, use_cache
+    )
+    if previous:
+        return previous
+
+    data, provenance = await _extract_company_fields(pages, use_cache)
+    return await asyncio.to_thread(_save_company_run, document, data, provenance, fingerprint, session)
 
 
 # ==========================================================
-# 3. Financial Highlights Extraction (AI)
+# 4. Financial Highlights Extraction (AI)
 # ==========================================================
 
-def extract_financials_ai(document_id: str, session: Session):
+def _prepare_financial_run(document_id: str, session: Session, use_cache: bool):
+    document, page_hashes = _load_document_pages(
+        document_id, session, "Run /extract/pdf first to extract text first."
+    )
+    pages = _select_financial_pages(document, page_hashes, session)
+    tables = load_tables(document.id, session)
+    fingerprint = _run_fingerprint(pages, tables=tables)
+    previous = _previous_run(document, "financials_ai", fingerprint, session) if use_cache else None
+    return document, pages, tables, fingerprint, previous
+
+
+def _save_financial_run(document: Document, data: dict, provenance: dict, fingerprint: str, session: Session) -> dict:
+    financial = _add_financial_record(document.company_id, data, session)
+    save_field_provenance(document, data, provenance, session)
+    result = jsonable_encoder({
+        "message": "Financial highlights extracted successfully",
+        "financial_highlight": financial,
+        "ai_raw_output": data,
+        "provenance": provenance
+    })
+    _record_run(document, "financials_ai", fingerprint, result, session)
+    session.commit()
+    return result
+
+
+async def extract_financials_ai(document_id: str, session: Session, use_cache: bool = True):
     """Extracts numeric financial performance metrics from annual report."""
-    document = session.get(Document, document_id)
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found.")
+    document, pages, tables, fingerprint, previous = await asyncio.to_thread(
+        _prepare_financial_run, document_id, session, use_cache
+    )
+    if previous:
+        return previous
+
+    data, provenance = await _extract_financial_fields(pages, tables, use_cache)
+    return await asyncio.to_thread(_save_financial_run, document, data, provenance, fingerprint, session)
+
+
+# ==========================================================
+# 5. Combined Company + Financial Extraction (AI)
+# ==========================================================
 
-    raw_pages = session.query(ExtractedField).filter(
-        ExtractedField.document_id == document_id
-    ).order_by(ExtractedField.page_number).all()
-
-    if not raw_pages:
-        raise HTTPException(status_code=400, detail="Run /extract/pdf first to extract text first.")
-
-    full_text = "\n".join([p.extracted_value or "" for p in raw_pages])
-    prompt = build_financial_prompt(full_text)
-    ai_response = call_ollama(prompt)
-    print("\n\n=== AI RAW FINANCIAL RESPONSE ===\n", ai_response, "\n=======================\n")
-
-    try:
-        data = parse_ai_json(ai_response)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="AI returned invalid JSON.")
-
-    financial = FinancialHighlight(
-        company_id=document.company_id,
-        period=data.get("period"),
-        currency=data.get("currency"),
-        revenue=extract_number(data.get("revenue")),
-        ebitda=extract_number(data.get("ebitda")),
-        ebitda_margin=extract_number(data.get("ebitda_margin")),
-        ebit=extract_number(data.get("ebit")),
-        ebit_margin=extract_number(data.get("ebit_margin")),
-        net_profit_after_tax=extract_number(data.get("net_profit_after_tax")),
-        capex=extract_number(data.get("capex")),
-        net_debt=extract_number(data.get("net_debt"))
+def _prepare_all_run(document_id: str, session: Session, use_cache: bool):
+    document, page_hashes = _load_document_pages(
+        document_id, session, "Run /extract/pdf first to extract text."
     )
+    company_pages = _select_company_pages(document, page_hashes, session)
+    financial_pages = _select_financial_pages(document, page_hashes, session)
+    tables = load_tables(document.id, session)
+    fingerprint = _run_fingerprint(company_pages, financial_pages, tables=tables)
+    previous = _previous_run(document, "all_ai", fingerprint, session) if use_cache else None
+    return document, company_pages, financial_pages, tables, fingerprint, previous
 
-    session.add(financial)
-    session.commit()
-    session.refresh(financial)
 
-    return {
-        "message": "Financial highlights extracted successfully",
+def _save_all_run(
+    document: Document,
+    company_data: dict,
+    company_provenance: dict,
+    financial_data: dict,
+    financial_provenance: dict,
+    fingerprint: str,
+    session: Session
+) -> dict:
+    company, investment = _add_company_records(document, company_data, session)
+    financial = _add_financial_record(company.id, financial_data, session)
+    save_field_provenance(document, company_data, company_provenance, session)
+    save_field_provenance(document, financial_data, financial_provenance, session)
+    result = jsonable_encoder({
+        "message": "AI extraction completed",
+        "company": company,
+        "investment": investment,
         "financial_highlight": financial,
-        "ai_raw_output": data
-    }
+        "ai_raw_output": {"company": company_data, "financials": financial_data},
+        "provenance": {**company_provenance, **financial_provenance}
+    })
+    _record_run(document, "all_ai", fingerprint, result, session)
+    session.commit()
+    return result
+
+
+async def extract_all_ai(document_id: str, session: Session, use_cache: bool = True):
+    """
+    Load page text once, run the company and financial extractions
+    concurrently, and write Company, Investment and FinancialHighlight in a
+    single transaction.
+    """
+    document, company_pages, financial_pages, tables, fingerprint, previous = await asyncio.to_thread(
+        _prepare_all_run, document_id, session, use_cache
+    )
+    if previous:
+        return previous
+
+    (company_data, company_provenance), (financial_data, financial_provenance) = await asyncio.gather(
+        _extract_company_fields(company_pages, use_cache),
+        _extract_financial_fields(financial_pages, tables, use_cache)
+    )
+    return await asyncio.to_thread(
+        _save_all_run,
+        document, company_data, company_provenance, financial_data, financial_provenance, fingerprint, session
+    )
@@ -0,0 +1,228 @@
+# app/services/ingest_service.py
+
+import uuid
+import asyncio
+from datetime import datetime
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.document import Document
+from app.services.document_service import store_upload, preview_from_cache
+from app.services.job_service import get_pdf_pool
+from app.services.ollama_service import call_ollama_async
+from app.services.entity_index import detect_entities
+from app.services.entity_store import upsert_entities
+from app.utils.json_parser import parse_ai_json, parse_ai_fields
+from app.utils.pdf_extractor import extract_stored_preview_text
+from app.utils.extraction_schema import json_schema, batch_json_schema, generation_options
+from app.utils.prompt_builder import FUND_COMPANY_FIELDS, build_fund_company_prompt, build_fund_company_batch_prompt
+
+def _preview_or_error(key: str) -> tuple[str, str]:
+    """Worker-process wrapper: (preview_text, error) — exceptions don't cross the pool cleanly."""
+    try:
+        return extract_stored_preview_text(key), None
+    except Exception as e:
+        return "", str(getattr(e, "detail", e))
+
+
+# ==========================================================
+#  1. Fund / Company detection (batched)
+# ==========================================================
+
+async def _detect_single(preview: str, use_cache: bool) -> dict:
+    try:
+        response = await call_ollama_async(
+            build_fund_company_prompt(preview),
+            options=generation_options(FUND_COMPANY_FIELDS),
+            use_cache=use_cache,
+            format=json_schema(FUND_COMPANY_FIELDS)
+        )
+        names, _failed = parse_ai_fields(response, FUND_COMPANY_FIELDS)
+        return names
+    except Exception as e:
+        print(f"⚠️ Fund/company detection failed: {e}")
+        return {}
+
+
+async def _detect_batch(previews: list[str], use_cache: bool) -> list[dict]:
+    """One prompt for several previews; falls back to one prompt per preview if the answer is unusable."""
+    if len(previews) == 1:
+        return [await _detect_single(previews[0], use_cache)]
+
+    trimmed = [p[:settings.INGEST_PREVIEW_CHARS] for p in previews]
+    try:
+        response = await call_ollama_async(
+            build_fund_company_batch_prompt(trimmed),
+            options=generation_options(FUND_COMPANY_FIELDS, count=len(previews)),
+            use_cache=use_cache,
+            format=batch_json_schema(FUND_COMPANY_FIELDS)
+        )
+        data = parse_ai_json(response)
+        entries = data.get("documents") or []
+        by_index = {int(e.get("document", i + 1)): e for i, e in enumerate(entries) if isinstance(e, dict)}
+        if len(by_index) == len(previews):
+            return [by_index.get(i, {}) for i in range(1, len(previews) + 1)]
+        print(f"⚠️ Batch detection returned {len(by_index)}/{len(previews)} entries — retrying individually")
+    except Exception as e:
+        print(f"⚠️ Batch detection failed ({e}) — retrying individually")
+
+    return list(await asyncio.gather(*(_detect_single(p, use_cache) for p in previews)))
+
+
+async def detect_fund_company_names(previews: list[str], use_cache: bool = True) -> list[dict]:
+    size = max(1, settings.INGEST_DETECT_BATCH_SIZE)
+    batches = [previews[i:i + size] for i in range(0, len(previews), size)]
+    results = await asyncio.gather(*(_detect_batch(b, use_cache) for b in batches))
+    return [names for batch in results for names in batch]
+
+
+# ==========================================================
+#  2. Entity resolution (one upsert per table)
+# ==========================================================
+
+def _match_known_entities(entries: list[dict], session: Session) -> list[dict]:
+    """Set fund_id/company_id from each preview with the name index; returns the entries left for the LLM."""
+    unresolved = []
+    for entry in entries:
+        matches = detect_entities(entry["preview"], session)
+        entry["fund_id"] = matches["fund"][0] if matches["fund"] else None
+        entry["company_id"] = matches["company"][0] if matches["company"] else None
+        if entry["fund_id"] is None or entry["company_id"] is None:
+            unresolved.append(entry)
+        else:
+            entry.pop("preview")
+    return unresolved
+
+
+def _resolve_entities(entries: list[dict], session: Session) -> tuple[dict, dict]:
+    """Map the detected names of entries the preview match left open to fund/company ids (caller commits)."""
+    funds = upsert_entities("fund", [e["fund_name"] for e in entries if e.get("fund_id") is None], session)
+    companies = upsert_entities("company", [e["company_name"] for e in entries if e.get("company_id") is None], session)
+    return funds, companies
+
+
+def _store_source(source) -> tuple[str, str]:
+    if callable(source):
+        with source() as fileobj:
+            return store_upload(fileobj)
+    return store_upload(source)
+
+
+def _cached_previews(entries: list[dict]) -> list:
+    return [preview_from_cache(entry["content_hash"]) for entry in entries]
+
+
+def _known_links(hashes: set[str], session: Session) -> dict[str, tuple]:
+    """content_hash → (fund_id, company_id) of an earlier document with the same bytes."""
+    known = {}
+    for doc in session.exec(select(Document).where(Document.content_hash.in_(list(hashes)))):
+        known.setdefault(doc.content_hash, (doc.fund_id, doc.company_id))
+    return known
+
+
+def _store_documents(pending: list[dict], known: dict, unresolved: list[dict], session: Session) -> list[Document]:
+    """Upsert the detected funds/companies and insert a Document per stored entry, in one commit."""
+    funds, companies = _resolve_entities(unresolved, session)
+
+    documents = []
+    for entry in pending:
+        if entry["status"] == "failed":
+            continue
+        if entry["content_hash"] in known:
+            fund_id, company_id = known[entry["content_hash"]]
+            entry["status"] = "duplicate"
+        else:
+            fund_id = entry["fund_id"] or funds[entry["fund_name"]]
+            company_id = entry["company_id"] or companies[entry["company_name"]]
+            entry["status"] = "created"
+
+        document = Document(
+            id=uuid.uuid4(),
+            file_name=entry["file_name"],
+            file_path=entry["file_path"],
+            content_hash=entry["content_hash"],
+            uploaded_at=datetime.utcnow(),
+            fund_id=fund_id,
+            company_id=company_id,
+        )
+        documents.append(document)
+        entry.update(document_id=document.id, fund_id=fund_id, company_id=company_id)
+
+    session.add_all(documents)
+    session.commit()
+    return documents
+
+
+# ==========================================================
+#  3. Bulk ingest
+# ==========================================================
+
+async def ingest_files(files: list[tuple[str, object]], session: Session, use_cache: bool = True) -> list[dict]:
+    """
+    Ingest many PDFs at once. `files` is a list of (file_name, source), where
+    source is a binary file object or a zero-argument opener returning one;
+    openers are called only while that file is stored, so large drops do not
+    hold a descriptor per file.
+
+    Files are streamed to storage, previews are extracted in parallel in the
+    PDF worker pool, fund/company names are resolved from the previews with
+    the in-memory name index (batched prompts only for the rest), and all
+    Document rows are inserted in a single commit.
+    Returns one status dict per input file, in input order.
+    """
+    report = []
+    pending = []  # stored entries that still need a Document
+
+    # Step 1: Stream to storage
+    for file_name, source in files:
+        entry = {"file_name": file_name, "status": None, "document_id": None, "error": None}
+        report.append(entry)
+        if not file_name.lower().endswith(".pdf"):
+            entry.update(status="rejected", error="Only PDF files are allowed.")
+            continue
+        try:
+            entry["content_hash"], entry["file_path"] = await asyncio.to_thread(_store_source, source)
+            pending.append(entry)
+        except Exception as e:
+            entry.update(status="failed", error=f"Error storing file: {getattr(e, 'detail', e)}")
+
+    if not pending:
+        return report
+
+    # Step 2: Known content → reuse the earlier document's fund/company
+    known = await asyncio.to_thread(_known_links, {e["content_hash"] for e in pending}, session)
+    to_detect = [e for e in pending if e["content_hash"] not in known]
+
+    # Step 3: Previews in parallel (cache first, then the worker pool)
+    loop = asyncio.get_running_loop()
+    preview_jobs = []
+    cached_previews = await asyncio.to_thread(_cached_previews, to_detect)
+    for entry, cached in zip(to_detect, cached_previews):
+        if cached is not None:
+            preview_jobs.append(asyncio.sleep(0, result=(cached, None)))
+        else:
+            preview_jobs.append(loop.run_in_executor(get_pdf_pool(), _preview_or_error, entry["file_path"]))
+    previews = await asyncio.gather(*preview_jobs)
+
+    detectable = []
+    for entry, (preview, error) in zip(to_detect, previews):
+        if error:
+            entry.update(status="failed", error=f"Error reading PDF: {error}")
+        else:
+            entry["preview"] = preview
+            detectable.append(entry)
+
+    # Step 4: Resolve names from the previews with the name index; batched AI detection for the rest
+    unresolved = await asyncio.to_thread(_match_known_entities, detectable, session)
+    print(f"🔎 Name index resolved {len(detectable) - len(unresolved)}/{len(detectable)} documents")
+
+    names = await detect_fund_company_names([e.pop("preview") for e in unresolved], use_cache=use_cache)
+    for entry, detected in zip(unresolved, names):
+        entry["fund_name"] = detected.get("fund_name") or "Unknown Fund"
+        entry["company_name"] = detected.get("company_name") or "Unknown Company"
+
+    # Step 5: Upsert entities + insert documents in one transaction
+    documents = await asyncio.to_thread(_store_documents, pending, known, unresolved, session)
+
+    print(f"📦 Bulk ingest: {len(documents)} documents stored out of {len(files)} files")
+    return report
@@ -0,0 +1,262 @@
+# app/services/job_service.py
+
+import json
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.document import Document
+from app.models.job import ExtractionJob
+from app.services.extract_service import (
+    sync_page_texts,
+    sync_document_tables,
+    extract_company_data_ai,
+    extract_financials_ai,
+    extract_all_ai
+)
+from app.utils.pdf_extractor import extract_document_cached
+
+JOB_TYPES = ("pdf", "company_ai", "financials_ai", "all_ai")
+
+AI_EXTRACTORS = {
+    "company_ai": extract_company_data_ai,
+    "financials_ai": extract_financials_ai,
+    "all_ai": extract_all_ai,
+}
+
+# Worker pools are created lazily so importing this module stays cheap
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_llm_slots: Optional[asyncio.Semaphore] = None
+
+# Keep references to running tasks so they aren't garbage-collected mid-flight
+_running_tasks: set = set()
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=settings.JOB_PDF_WORKERS)
+    return _pdf_pool
+
+
+def _get_llm_slots() -> asyncio.Semaphore:
+    global _llm_slots
+    if _llm_slots is None:
+        _llm_slots = asyncio.Semaphore(settings.JOB_LLM_CONCURRENCY)
+    return _llm_slots
+
+
+def shutdown_job_workers():
+    """Stop the PDF worker processes (called on app shutdown)."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+# ==========================================================
+#  1. Enqueue + Status
+# ==========================================================
+
+def _create_job(document_id: str, job_type: str, session: Session, use_cache: bool) -> ExtractionJob:
+    if job_type not in JOB_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown job type: {job_type}")
+
+    document = session.get(Document, document_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found.")
+
+    job = ExtractionJob(document_id=document.id, job_type=job_type, use_cache=use_cache)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def _schedule(job_id: UUID):
+    task = asyncio.get_running_loop().create_task(_run_job(job_id))
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+
+
+async def enqueue_job(document_id: str, job_type: str, session: Session, use_cache: bool = True) -> ExtractionJob:
+    """Persist a queued job (in a worker thread) and schedule it on the running event loop."""
+    job = await asyncio.to_thread(_create_job, document_id, job_type, session, use_cache)
+    _schedule(job.id)
+    return job
+
+
+def _reconcile_jobs() -> list[UUID]:
+    """
+    Jobs run as tasks of the API process, so any job still "running" at
+    startup was cut off by a restart or crash: mark it failed. Returns the
+    ids of queued jobs, which never started and can be run now.
+    """
+    with Session(engine) as session:
+        session.execute(
+            update(ExtractionJob)
+            .where(ExtractionJob.status == "running")
+            .values(status="failed", error="Interrupted by a server restart; enqueue it again.",
+                    finished_at=datetime.utcnow())
+        )
+        session.commit()
+        return list(session.exec(
+            select(ExtractionJob.id).where(ExtractionJob.status == "queued").order_by(ExtractionJob.created_at)
+        ))
+
+
+async def recover_jobs():
+    """Called on app startup: fail interrupted jobs and re-schedule queued ones."""
+    queued = await asyncio.to_thread(_reconcile_jobs)
+    for job_id in queued:
+        _schedule(job_id)
+    if queued:
+        print(f"🔁 Re-scheduled {len(queued)} queued extraction job(s)")
+
+
+def get_job(job_id: str, session: Session) -> ExtractionJob:
+    job = session.get(ExtractionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+def job_to_dict(job: ExtractionJob) -> dict:
+    return {
+        "id": job.id,
+        "document_id": job.document_id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "progress": job.progress,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+
+# ==========================================================
+#  2. Job Execution
+# ==========================================================
+
+def _update_job(job_id: UUID, **changes) -> ExtractionJob:
+    with Session(engine) as session:
+        job = session.get(ExtractionJob, job_id)
+        for key, value in changes.items():
+            setattr(job, key, value)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+
+def _claim_job(job_id: UUID) -> Optional[ExtractionJob]:
+    """queued → running, atomically; None if another process already claimed the job."""
+    with Session(engine) as session:
+        claimed = session.execute(
+            update(ExtractionJob)
+            .where(ExtractionJob.id == job_id, ExtractionJob.status == "queued")
+            .values(status="running", progress=5, started_at=datetime.utcnow())
+        ).rowcount
+        session.commit()
+        return session.get(ExtractionJob, job_id) if claimed else None
+
+
+async def _run_job(job_id: UUID):
+    job = await asyncio.to_thread(_claim_job, job_id)
+    if job is None:
+        return
+
+    try:
+        if job.job_type == "pdf":
+            result = await _run_pdf_job(job)
+        else:
+            result = await _run_ai_job(job)
+    except HTTPException as e:
+        await asyncio.to_thread(
+            _update_job, job_id, status="failed", error=str(e.detail), finished_at=datetime.utcnow()
+        )
+        return
+    except Exception as e:
+        print(f"❌ Job {job_id} failed: {e}")
+        await asyncio.to_thread(
+            _update_job, job_id, status="failed", error=str(e), finished_at=datetime.utcnow()
+        )
+        return
+
+    await asyncio.to_thread(
+        _update_job,
+        job_id,
+        status="completed",
+        progress=100,
+        result=json.dumps(jsonable_encoder(result)),
+        finished_at=datetime.utcnow()
+    )
+
+
+def _save_extraction(document_id: UUID, extraction: dict) -> dict:
+    with Session(engine) as session:
+        document = session.get(Document, document_id)
+        changes = sync_page_texts(document, extraction["pages"], session)
+        changes["tables"] = sync_document_tables(document, extraction["tables"], session)
+        return changes
+
+
+async def _run_pdf_job(job: ExtractionJob) -> dict:
+    """Parse the PDF (text + tables) in the process pool, then write rows from a thread."""
+    with Session(engine) as session:
+        document = session.get(Document, job.document_id)
+        file_path = document.file_path
+        content_hash = document.content_hash
+
+    loop = asyncio.get_running_loop()
+    try:
+        extraction = await loop.run_in_executor(
+            get_pdf_pool(), extract_document_cached, file_path, content_hash
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading PDF: {e}")
+
+    await asyncio.to_thread(_update_job, job.id, progress=80)
+    changes = await asyncio.to_thread(_save_extraction, job.document_id, extraction)
+    pages = extraction["pages"]
+
+    return {
+        "message": "PDF text extraction completed",
+        "pages_extracted": changes["pages"],
+        "pages_inserted": changes["inserted"],
+        "pages_updated": changes["updated"],
+        "pages_unchanged": changes["unchanged"],
+        "pages_deleted": changes["deleted"],
+        # Page text is served by the streaming pages endpoint rather than inlined here
+        "pages_url": f"{settings.API_V1_STR}/documents/{job.document_id}/pages",
+        "pages_ocr": sum(1 for p in pages if p["method"] == "ocr"),
+        "tables_extracted": changes["tables"],
+        "tables_url": f"{settings.API_V1_STR}/documents/{job.document_id}/tables",
+        "document_id": job.document_id
+    }
+
+
+async def _run_ai_job(job: ExtractionJob) -> dict:
+    """
+    LLM jobs share a small number of slots; the Ollama client additionally
+    caps in-flight generations. The extractors run their database and CPU
+    steps in threads and only await generation on the event loop; they
+    return JSON-ready results.
+    """
+    extractor = AI_EXTRACTORS[job.job_type]
+
+    async with _get_llm_slots():
+        await asyncio.to_thread(_update_job, job.id, progress=20)
+        with Session(engine) as session:
+            return await extractor(str(job.document_id), session, use_cache=job.use_cache)
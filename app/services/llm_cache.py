@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+from app.core.config import settings
+
+# Process-local counters, exposed through cache_stats()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+# sqlite connections can't be shared across threads
+_local = threading.local()
+
+
+def make_cache_key(model: str, prompt: str, options: Optional[dict] = None, format: Optional[dict] = None) -> str:
+    """Key on model, prompt hash, generation options and output schema."""
+    key = {
+        "model": model,
+        "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "options": options or {},
+    }
+    if format is not None:
+        # Only present for constrained calls, so existing unconstrained entries keep their keys
+        key["format"] = format
+    payload = json.dumps(key, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        cache_dir = os.path.dirname(settings.LLM_CACHE_PATH)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        conn = sqlite3.connect(settings.LLM_CACHE_PATH, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used_at)")
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def _count(stat: str, n: int = 1):
+    with _stats_lock:
+        _stats[stat] += n
+
+
+def get_cached_response(key: str) -> Optional[str]:
+    """Return a cached response that is still within its TTL, or None."""
+    conn = _connect()
+    row = conn.execute(
+        "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+    ).fetchone()
+
+    now = time.time()
+    if row is None or now - row[1] > settings.LLM_CACHE_TTL_SECONDS:
+        _count("misses")
+        return None
+
+    conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+    conn.commit()
+    _count("hits")
+    return row[0]
+
+
+def store_response(key: str, model: str, response: str):
+    """Insert/replace a response, then drop expired and least-recently-used entries."""
+    conn = _connect()
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_used_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (key, model, response, now, now),
+    )
+    _count("writes")
+
+    evicted = conn.execute(
+        "DELETE FROM llm_cache WHERE created_at < ?", (now - settings.LLM_CACHE_TTL_SECONDS,)
+    ).rowcount
+    evicted += conn.execute(
+        """
+        DELETE FROM llm_cache WHERE key IN (
+            SELECT key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+        )
+        """,
+        (settings.LLM_CACHE_MAX_ENTRIES,),
+    ).rowcount
+    conn.commit()
+
+    if evicted:
+        _count("evictions", evicted)
+
+
+def cache_stats() -> dict:
+    entries = _connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+    stats["entries"] = entries
+    return stats
+
+
+def clear_cache() -> int:
+    conn = _connect()
+    deleted = conn.execute("DELETE FROM llm_cache").rowcount
+    conn.commit()
+    return deleted
\ No newline at end of file
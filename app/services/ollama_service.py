@@ -1,13 +1,175 @@
-import requests
+import json
+import time
+import asyncio
+from typing import Optional
+import httpx
+from app.core.config import settings
+from app.services.llm_cache import make_cache_key, get_cached_response, store_response
+from app.utils.json_parser import StreamingJSONParser, parse_ai_json
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
 
-def call_ollama(prompt: str, model: str = "phi3"):
+def _generate_url() -> str:
+    return settings.OLLAMA_API_URL.rstrip("/") + "/api/generate"
+
+
+def _build_payload(prompt: str, model: str, options: Optional[dict], format: Optional[dict]) -> dict:
     payload = {
         "model": model,
         "prompt": prompt,
-        "stream": False
+        "stream": True
     }
-    response = requests.post(OLLAMA_URL, json=payload)
-    response.raise_for_status()
-    return response.json().get("response", "")
+    if options:
+        payload["options"] = options
+    if format is not None:
+        # JSON schema: Ollama constrains decoding to it
+        payload["format"] = format
+    return payload
+
+
+# ==========================================================
+#  Async client (pooled, concurrency-limited)
+# ==========================================================
+
+def _parses(text: str, json_only: bool) -> bool:
+    """Only responses that are usable are cached; a bad answer would otherwise be replayed until the TTL."""
+    if not text:
+        return False
+    if not json_only:
+        return True
+    try:
+        parse_ai_json(text)
+        return True
+    except ValueError:
+        return False
+
+
+class AsyncOllamaClient:
+    """
+    Shared httpx connection pool plus a semaphore capping in-flight
+    generations to OLLAMA_MAX_CONCURRENCY. Both are bound to the event loop
+    that first uses them and rebuilt, closing the old pool, if a different
+    loop shows up (e.g. CLI runs via asyncio.run).
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    async def _ensure_ready(self):
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            await self._close_stale_client()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    settings.OLLAMA_READ_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(max_connections=settings.OLLAMA_MAX_CONCURRENCY * 2)
+            )
+            self._slots = asyncio.Semaphore(settings.OLLAMA_MAX_CONCURRENCY)
+            self._loop = loop
+
+    async def _close_stale_client(self):
+        """Close the pool left by a previous event loop: on that loop if it still runs, else from here."""
+        client, stale_loop = self._client, self._loop
+        self._client = None
+        if stale_loop.is_running() and not stale_loop.is_closed():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), stale_loop))
+            return
+        try:
+            await client.aclose()
+        except RuntimeError:
+            # Transports of a closed loop cannot be shut down cleanly; the pool is dropped regardless
+            pass
+
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        options: Optional[dict] = None,
+        use_cache: bool = True,
+        json_only: bool = True,
+        format: Optional[dict] = None
+    ) -> str:
+        model = model or settings.OLLAMA_MODEL
+        cache_key = make_cache_key(model, prompt, options, format)
+        if use_cache:
+            # sqlite I/O stays off the event loop
+            cached = await asyncio.to_thread(get_cached_response, cache_key)
+            if cached is not None:
+                return cached
+
+        await self._ensure_ready()
+        payload = _build_payload(prompt, model, options, format)
+
+        async with self._slots:
+            for attempt in range(settings.OLLAMA_MAX_RETRIES + 1):
+                try:
+                    text, completed = await self._stream(payload, json_only)
+                    break
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = (
+                        isinstance(e, httpx.TransportError)
+                        or e.response.status_code in RETRYABLE_STATUS
+                    )
+                    if not retryable or attempt == settings.OLLAMA_MAX_RETRIES:
+                        raise
+                    delay = settings.OLLAMA_RETRY_BACKOFF * (2 ** attempt)
+                    print(f"⚠️ Ollama request failed ({e}); retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+
+        if completed and _parses(text, json_only):
+            await asyncio.to_thread(store_response, cache_key, model, text)
+        return text
+
+    async def _stream(self, payload: dict, json_only: bool) -> tuple[str, bool]:
+        """
+        Consume the token stream; returns (text, completed). Leaving the stream
+        context early closes the connection, which makes Ollama stop
+        generating. Output cut off by the token limit (done_reason "length")
+        or a dropped stream is not completed.
+        """
+        completed = False
+        detector = StreamingJSONParser() if json_only else None
+        parts = []
+        started = time.perf_counter()
+
+        async with self._client.stream("POST", _generate_url(), json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                parts.append(token)
+                if chunk.get("done"):
+                    completed = chunk.get("done_reason") != "length"
+                    break
+                if detector and detector.feed(token):
+                    print(f"✂️ JSON complete after {time.perf_counter() - started:.1f}s — stopping generation")
+                    completed = True
+                    break
+
+        return "".join(parts), completed
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+ollama_client = AsyncOllamaClient()
+
+async def call_ollama_async(
+    prompt: str,
+    model: Optional[str] = None,
+    options: Optional[dict] = None,
+    use_cache: bool = True,
+    json_only: bool = True,
+    format: Optional[dict] = None
+) -> str:
+    return await ollama_client.generate(
+        prompt, model=model, options=options, use_cache=use_cache, json_only=json_only, format=format
+    )
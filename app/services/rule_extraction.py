@@ -0,0 +1,190 @@
+# app/services/rule_extraction.py
+
+import re
+from typing import Optional
+from app.utils.cleaner import normalize_number, parse_currency_label
+
+# Row labels of a standard "Financial highlights" table, matched against the
+# cleaned first cell of each row (see _clean_label)
+FINANCIAL_ROW_LABELS = {
+    "revenue": r"(total |net )?(revenues?|sales|turnover)",
+    "ebitda": r"(adjusted |adj\.? |reported )?ebitda",
+    "ebitda_margin": r"(adjusted |adj\.? |reported )?ebitda margin",
+    "ebit": r"(adjusted |adj\.? )?(ebit|operating (profit|income))",
+    "ebit_margin": r"(ebit|operating) margin",
+    "net_profit_after_tax": r"net (profit|income)( after tax(ation)?)?|profit after tax(ation)?|npat",
+    "capex": r"capex|capital expenditures?",
+    "net_debt": r"net debt",
+}
+
+LABEL_PATTERNS = {field: re.compile(pattern) for field, pattern in FINANCIAL_ROW_LABELS.items()}
+
+PERIOD_RE = re.compile(
+    r"(fy\s?'?\d{2,4}|(?:19|20)\d{2}|[a-z]{3}[-\s']?\d{2,4}|[12]h\s?'?\d{2,4}|q[1-4]\s?'?\d{2,4}|ltm\s?\S*)"
+    r"\s*(a|b|e|f|p|actual|budget|forecast|estimate|plan)?",
+    re.IGNORECASE
+)
+FORECAST_SUFFIXES = {"b", "e", "f", "p", "budget", "forecast", "estimate", "plan"}
+YEAR_RE = re.compile(r"(?:19|20)?(\d{2})(?!.*\d)")
+
+NUMBER = r"\(?[-–]?\s?(?:[A-Z]{3}\s?|US\$|[$€£₩])?\d[\d,]*(?:\.\d+)?\s?(?:%|bn|billion|mn|million|m|k)?\)?"
+NUMBER_RE = re.compile(NUMBER)
+STANDALONE_YEAR_RE = re.compile(r"^(?:19|20)\d{2}$")
+TEXT_VALUE_PATTERNS = {
+    field: re.compile(
+        rf"\b(?:{pattern})\b\s*(?:of|was|were|is|at|reached|totall?ed|amounted to|:|-|–)?\s*(?P<value>{NUMBER})",
+        re.IGNORECASE
+    )
+    for field, pattern in FINANCIAL_ROW_LABELS.items()
+}
+
+TABLE_CONFIDENCE = 0.9
+TEXT_CONFIDENCE = 0.7
+
+
+def _clean_label(cell: str) -> str:
+    """'Revenue (USD m)¹' → 'revenue'."""
+    label = re.sub(r"\(.*?\)", " ", cell.lower())
+    label = re.sub(r"[\d*†‡¹²³:]+$", "", label.strip())
+    return " ".join(label.split())
+
+
+def match_row_label(cell: str) -> Optional[str]:
+    label = _clean_label(cell)
+    for field, pattern in LABEL_PATTERNS.items():
+        if pattern.fullmatch(label):
+            return field
+    return None
+
+
+def _is_value(cell: str) -> bool:
+    return normalize_number(cell)["value"] is not None
+
+
+# ==========================================================
+#  1. Table cells
+# ==========================================================
+
+def _period_rank(cell: str):
+    """Sort key for a period header: actuals before forecasts, then the latest year."""
+    match = PERIOD_RE.fullmatch(cell.strip())
+    if not match:
+        return None
+    suffix = (match.group(2) or "").lower()
+    year = YEAR_RE.search(match.group(1))
+    return (suffix not in FORECAST_SUFFIXES, int(year.group(1)) if year else 0)
+
+
+def _find_period_column(rows: list[list[str]]):
+    """(header_row_index, column, period_label) of the most recent actual period, or None."""
+    for index, row in enumerate(rows[:3]):
+        if match_row_label(next((cell for cell in row if cell), "")):
+            break  # reached the data rows
+        ranked = [(rank, column) for column, cell in enumerate(row) if (rank := _period_rank(cell))]
+        if ranked:
+            # max rank; on ties the leftmost column
+            rank, column = max(ranked, key=lambda x: (x[0], -x[1]))
+            return index, column, row[column].strip()
+    return None
+
+
+def read_financial_table(table: dict) -> Optional[dict]:
+    """Field values from one structured table for its most recent period column."""
+    rows = table["rows"]
+    found = _find_period_column(rows)
+    if not found:
+        return None
+
+    header_index, column, period = found
+    values = {}
+    for row in rows[header_index + 1:]:
+        label = next((cell for cell in row if cell), "")
+        field = match_row_label(label)
+        if field and field not in values and column < len(row) and _is_value(row[column]):
+            values[field] = row[column].strip()
+
+    if not values:
+        return None
+    return {"period": period, "values": values, "page_number": table["page_number"], "table": table}
+
+
+def detect_currency(text: str) -> Optional[str]:
+    """'USD m', 'KRW bn', ... from the first currency mention in the text."""
+    currency, scale = parse_currency_label(text)
+    if currency is None:
+        return None
+    return f"{currency} {scale or ''}".strip()
+
+
+# ==========================================================
+#  2. Free-text lines ("EBITDA margin of 23.4%")
+# ==========================================================
+
+def _text_value(field: str, text: str) -> Optional[str]:
+    """A value stated on a single line next to the field label, if unambiguous."""
+    pattern = TEXT_VALUE_PATTERNS[field]
+    for line in text.splitlines():
+        match = pattern.search(line)
+        if not match:
+            continue
+        numbers = [n for n in NUMBER_RE.findall(line) if not STANDALONE_YEAR_RE.match(n.strip(" ,"))]
+        # Several numbers on the line usually means a text-layer table row (which column?)
+        if len(numbers) == 1:
+            return match.group("value").strip()
+    return None
+
+
+# ==========================================================
+#  3. Entry point
+# ==========================================================
+
+def extract_financials_by_rules(tables: list[dict], pages: list[tuple[int, str]]) -> tuple[dict, dict]:
+    """
+    Fill FinancialHighlight fields without the LLM.
+
+    Tables are read first: the table resolving the most fields wins and
+    other tables for the same period fill its gaps. Remaining numeric fields
+    are looked up in single-value text lines of the given pages.
+    Returns (data, provenance) with only the resolved fields; provenance maps
+    field → {"page_number", "confidence", "method"} ("table" or "regex").
+    """
+    data, provenance = {}, {}
+
+    readings = [r for r in (read_financial_table(t) for t in tables) if r]
+    readings.sort(key=lambda r: -len(r["values"]))
+    if readings:
+        best = readings[0]
+        for reading in readings:
+            if reading["period"] != best["period"]:
+                continue
+            for field, value in reading["values"].items():
+                if field not in data:
+                    data[field] = value
+                    provenance[field] = {
+                        "page_number": reading["page_number"],
+                        "confidence": TABLE_CONFIDENCE,
+                        "method": "table"
+                    }
+
+        data["period"] = best["period"]
+        provenance["period"] = {"page_number": best["page_number"], "confidence": TABLE_CONFIDENCE, "method": "table"}
+
+        # Currency/scale usually sits in the label cells or the caption on the same page
+        page_text = dict(pages).get(best["page_number"], "")
+        cells = " ".join(cell for row in best["table"]["rows"] for cell in row)
+        currency = detect_currency(cells) or detect_currency(page_text)
+        if currency:
+            data["currency"] = currency
+            provenance["currency"] = {"page_number": best["page_number"], "confidence": TABLE_CONFIDENCE, "method": "table"}
+
+    for field in FINANCIAL_ROW_LABELS:
+        if field in data:
+            continue
+        for page_number, text in pages:
+            value = _text_value(field, text)
+            if value is not None:
+                data[field] = value
+                provenance[field] = {"page_number": page_number, "confidence": TEXT_CONFIDENCE, "method": "regex"}
+                break
+
+    return data, provenance
@@ -0,0 +1,67 @@
+# Rough token estimate: ~4 characters per token for English report text
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_oversized(text: str, max_chars: int) -> list[str]:
+    """Split a single page that doesn't fit the budget on line boundaries."""
+    pieces, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            pieces.append(current)
+            current = ""
+        current += line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_pages(pages: list[tuple[int, str]], max_tokens: int) -> list[dict]:
+    """
+    Pack (page_number, text) pairs into chunks of at most max_tokens.
+    Pages are kept whole where possible; each chunk records the page numbers
+    it covers and the character offset where each page starts in its text.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    chunks = []
+    current = {"pages": [], "offsets": [], "text": ""}
+
+    def flush():
+        if current["text"].strip():
+            chunks.append(dict(current))
+        current.update(pages=[], offsets=[], text="")
+
+    for page_number, text in pages:
+        text = (text or "").strip()
+        if not text:
+            continue
+
+        for piece in _split_oversized(text, max_chars):
+            if current["text"] and len(current["text"]) + len(piece) + 1 > max_chars:
+                flush()
+            if current["text"]:
+                current["text"] += "\n"
+            current["pages"] = current["pages"] + [page_number]
+            current["offsets"] = current["offsets"] + [len(current["text"])]
+            current["text"] += piece
+
+    flush()
+    return chunks
+
+
+def page_at_offset(chunk: dict, offset: int) -> int:
+    """Page number of the chunk text at a character offset."""
+    page = chunk["pages"][0]
+    for page_number, start in zip(chunk["pages"], chunk["offsets"]):
+        if start > offset:
+            break
+        page = page_number
+    return page
\ No newline at end of file
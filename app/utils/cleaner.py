@@ -1,10 +1,155 @@
 import re
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Optional
 
-def extract_number(value):
-    """Safely extract a numeric value from a messy string (e.g., '$4.2 billion', '65%')."""
-    if not value:
-        return 0.0
-    if isinstance(value, (int, float)):
-        return float(value)
-    match = re.search(r"(\d+(\.\d+)?)", str(value))
-    return float(match.group(1)) if match else 0.0
\ No newline at end of file
+CURRENCY_CODES = "USD|EUR|GBP|KRW|JPY|CNY|RMB|AUD|SGD|HKD|CHF|INR|VND|CAD|NZD|SEK|NOK|DKK"
+CURRENCY_SYMBOLS = {"US$": "USD", "$": "USD", "€": "EUR", "£": "GBP", "₩": "KRW", "¥": "JPY", "RMB": "CNY"}
+
+# Canonical scale label → multiplier
+SCALES = {
+    "k": Decimal(10) ** 3,
+    "m": Decimal(10) ** 6,
+    "bn": Decimal(10) ** 9,
+    "tn": Decimal(10) ** 12,
+}
+SCALE_ALIASES = {
+    "k": "k", "thousand": "k", "thousands": "k", "'000": "k", "000s": "k",
+    "m": "m", "mn": "m", "mm": "m", "million": "m", "millions": "m",
+    "b": "bn", "bn": "bn", "billion": "bn", "billions": "bn",
+    "tn": "tn", "trillion": "tn", "trillions": "tn",
+}
+UNIT_ALIASES = {"%": "%", "pct": "%", "percent": "%", "x": "x"}
+
+SCALE_WORDS = r"trillions?|tn|billions?|bn|b|millions?|mn|mm|m|thousands?|k|'000|000s"
+
+NUMBER_RE = re.compile(
+    rf"""
+    (?P<open>\()?\s*
+    (?P<sign>[-–−+])?\s*
+    (?P<cur_pre>US\$|[$€£₩¥]|(?:{CURRENCY_CODES})(?=\s?[-–−(]?\s?[\d.]))?\s*
+    (?P<sign2>[-–−])?\s*
+    (?P<open2>\()?\s*
+    (?P<num>\d{{1,3}}(?:[,'\u00a0\u202f]\d{{3}})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)
+    \s?(?P<unit>{SCALE_WORDS}|%|pct|percent|x)?(?![A-Za-z])
+    \s*(?P<cur_post>(?:{CURRENCY_CODES})(?![A-Za-z]))?
+    \s*(?:(?P<close>\))\s?(?P<unit2>{SCALE_WORDS})?(?![A-Za-z]))?
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+CURRENCY_LABEL_RE = re.compile(
+    rf"(?<![A-Za-z])({CURRENCY_CODES}|US\$|[$€£₩¥])\s?({SCALE_WORDS})?(?![A-Za-z])",
+    re.IGNORECASE
+)
+BARE_YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+SEPARATORS_RE = re.compile(r"[,'\u00a0\u202f]")
+
+MISSING_VALUES = {"", "-", "–", "—", "n/a", "na", "n.a.", "nm", "n.m.", "none", "null", "unknown", "not available"}
+
+
+def _currency_code(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    return CURRENCY_SYMBOLS.get(token) or CURRENCY_SYMBOLS.get(token.upper()) or token.upper()
+
+
+def parse_currency_label(text: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """'KRW bn' → ('KRW', 'bn'); '€m' → ('EUR', 'm'); no currency → (None, None)."""
+    match = CURRENCY_LABEL_RE.search(text or "")
+    if not match:
+        return None, None
+    scale = SCALE_ALIASES.get((match.group(2) or "").lower())
+    return _currency_code(match.group(1)), scale
+
+
+def _missing(raw) -> dict:
+    return {"value": None, "currency": None, "scale": None, "unit": None, "raw": raw}
+
+
+def _parse(text: str) -> dict:
+    if text.strip().lower() in MISSING_VALUES:
+        return _missing(text)
+
+    matches = list(NUMBER_RE.finditer(text))
+    if not matches:
+        return _missing(text)
+
+    # "FY2023 revenue: 1,234" — skip a leading bare year when another number follows
+    match = matches[0]
+    if len(matches) > 1 and BARE_YEAR_RE.fullmatch(match.group("num")) and not match.group("unit"):
+        match = matches[1]
+
+    try:
+        value = Decimal(SEPARATORS_RE.sub("", match.group("num")))
+    except InvalidOperation:
+        return _missing(text)
+
+    sign = match.group("sign") or match.group("sign2")
+    if ((match.group("open") or match.group("open2")) and match.group("close")) or (sign and sign != "+"):
+        value = -value
+
+    # "$ (3.4) m" — the scale may follow the closing parenthesis
+    unit_token = (match.group("unit") or match.group("unit2") or "").lower()
+    currency = _currency_code(match.group("cur_pre") or match.group("cur_post"))
+    scale = SCALE_ALIASES.get(unit_token)
+    if currency is None or scale is None:
+        # "1,234.5 (USD m)" — currency / scale stated elsewhere in the string
+        label_currency, label_scale = parse_currency_label(text)
+        currency = currency or label_currency
+        scale = scale or (label_scale if not UNIT_ALIASES.get(unit_token) else None)
+
+    return {
+        "value": value,
+        "currency": currency,
+        "scale": scale,
+        "unit": UNIT_ALIASES.get(unit_token),
+        "raw": text,
+    }
+
+
+def normalize_numbers(values: Iterable) -> list[dict]:
+    """
+    Normalize a batch of messy numeric strings ('$4.2bn', '(12.3)', '1,234.5',
+    '65%', 'n/a') in one pass with precompiled patterns; repeated strings are
+    parsed once. Each result is a dict:
+      value    Decimal as stated (sign applied, separators removed) or None if missing
+      currency ISO code ('USD', 'KRW', ...) or None
+      scale    'k' / 'm' / 'bn' / 'tn' or None
+      unit     '%' / 'x' or None
+      raw      the input
+    Missing values are None, never 0.
+    """
+    parsed: dict[str, dict] = {}
+    results = []
+    for value in values:
+        if value is None or isinstance(value, bool):
+            results.append(_missing(value))
+        elif isinstance(value, (int, float, Decimal)):
+            results.append({"value": Decimal(str(value)), "currency": None, "scale": None, "unit": None, "raw": value})
+        else:
+            text = str(value)
+            if text not in parsed:
+                parsed[text] = _parse(text)
+            results.append(parsed[text])
+    return results
+
+
+def normalize_number(value) -> dict:
+    return normalize_numbers([value])[0]
+
+
+def rescale(number: dict, target_scale: Optional[str]) -> Optional[Decimal]:
+    """Value expressed in target_scale ('USD 1.2bn' in 'm' → 1200); unchanged if either scale is unknown."""
+    if number["value"] is None:
+        return None
+    if not number["scale"] or not target_scale or number["scale"] == target_scale:
+        return number["value"]
+    return number["value"] * SCALES[number["scale"]] / SCALES[target_scale]
+
+
+def absolute_value(number: dict) -> Optional[Decimal]:
+    """Value with its scale applied ('$4.2 billion' → 4200000000)."""
+    if number["value"] is None:
+        return None
+    if not number["scale"]:
+        return number["value"]
+    return number["value"] * SCALES[number["scale"]]
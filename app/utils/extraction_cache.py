@@ -0,0 +1,76 @@
+import os
+import json
+import uuid
+import hashlib
+from typing import Optional
+from app.core.config import settings
+
+# Bump when the shape or quality of extracted pages changes so stale entries are ignored
+CACHE_VERSION = 2
+
+def stream_sha256(fileobj, chunk_size: int = 1024 * 1024) -> str:
+    sha = hashlib.sha256()
+    while chunk := fileobj.read(chunk_size):
+        sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _entry_path(content_hash: str) -> str:
+    return os.path.join(settings.EXTRACTION_CACHE_DIR, f"{content_hash}.json")
+
+
+def get_cached_extraction(content_hash: str) -> Optional[dict]:
+    """Return the cached extraction ({"pages": [...], "tables": [...]}) for a PDF hash, or None."""
+    path = _entry_path(content_hash)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if entry.get("version") != CACHE_VERSION:
+        return None
+
+    # Touch so eviction treats this entry as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return entry
+
+
+def store_cached_extraction(content_hash: str, extraction: dict):
+    """Write an extraction to the cache atomically, then enforce the size limit."""
+    os.makedirs(settings.EXTRACTION_CACHE_DIR, exist_ok=True)
+    path = _entry_path(content_hash)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, **extraction}, f)
+    os.replace(tmp_path, path)
+
+    _evict(keep=path)
+
+
+def _evict(keep: Optional[str] = None):
+    """Delete least-recently-used entries until the cache fits EXTRACTION_CACHE_MAX_BYTES."""
+    entries = []
+    total = 0
+    with os.scandir(settings.EXTRACTION_CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    for _mtime, size, path in sorted(entries):
+        if total <= settings.EXTRACTION_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
\ No newline at end of file
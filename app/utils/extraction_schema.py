@@ -0,0 +1,94 @@
+from app.core.config import settings
+
+# Every extraction field set is defined once here. The prompt template,
+# the JSON-schema `format` constraint sent to Ollama and the num_predict cap
+# are all generated from these specs. max_chars bounds the value length.
+
+FUND_COMPANY_SCHEMA = {
+    "fund_name": {"max_chars": 120, "description": "Name of the private equity fund"},
+    "company_name": {"max_chars": 120, "description": "Name of the portfolio company"},
+}
+
+# Company + Investment
+COMPANY_SCHEMA = {
+    "company_name": {"max_chars": 120, "description": "Portfolio company name"},
+    "holding_company": {"max_chars": 120, "description": "Parent / holding company"},
+    "business_description": {"max_chars": 600, "description": "What the company does"},
+    "head_office_location": {"max_chars": 120, "description": "Head office city / country"},
+    "fund_role": {"max_chars": 60, "description": "Fund role, e.g. lead investor"},
+    "investment_type": {"max_chars": 60, "description": "e.g. primary, co-investment, buyout"},
+    "ownership_percent": {"max_chars": 20, "description": "Fund ownership, e.g. 45%"},
+    "first_completion_date": {"max_chars": 30, "description": "Date of first completion"},
+    "transaction_value": {"max_chars": 40, "description": "Amount with currency, e.g. USD 1.2bn"},
+    "current_cost": {"max_chars": 40, "description": "Amount with currency"},
+    "fair_value": {"max_chars": 40, "description": "Amount with currency"},
+}
+
+# FinancialHighlight
+FINANCIAL_SCHEMA = {
+    "period": {"max_chars": 20, "description": "Reporting period, e.g. FY2023"},
+    "currency": {"max_chars": 20, "description": "Currency and scale, e.g. USD m"},
+    "revenue": {"max_chars": 30, "description": "Number as written in the report"},
+    "ebitda": {"max_chars": 30, "description": "Number as written in the report"},
+    "ebitda_margin": {"max_chars": 20, "description": "Percentage"},
+    "ebit": {"max_chars": 30, "description": "Number as written in the report"},
+    "ebit_margin": {"max_chars": 20, "description": "Percentage"},
+    "net_profit_after_tax": {"max_chars": 30, "description": "Number as written in the report"},
+    "capex": {"max_chars": 30, "description": "Number as written in the report"},
+    "net_debt": {"max_chars": 30, "description": "Number as written in the report"},
+}
+
+FIELD_SPECS = {**FUND_COMPANY_SCHEMA, **COMPANY_SCHEMA, **FINANCIAL_SCHEMA}
+
+# Lower than chunker.CHARS_PER_TOKEN (prose input): numbers and short values
+# tokenize densely, and underestimating num_predict would truncate the JSON
+OUTPUT_CHARS_PER_TOKEN = 3
+TOKENS_PER_FIELD = 6  # quotes, key, colon, comma, whitespace
+OBJECT_TOKENS = 8  # braces + slack for the stream to close
+
+
+def json_schema(fields: list[str]) -> dict:
+    """JSON schema for a flat object of the given fields (string or null values, all required)."""
+    return {
+        "type": "object",
+        "properties": {
+            field: {
+                "type": ["string", "null"],
+                "maxLength": FIELD_SPECS[field]["max_chars"],
+                "description": FIELD_SPECS[field]["description"],
+            }
+            for field in fields
+        },
+        "required": list(fields),
+        "additionalProperties": False,
+    }
+
+
+def batch_json_schema(fields: list[str]) -> dict:
+    """{"documents": [{"document": n, ...fields}]} — one entry per document of a batch prompt."""
+    item = json_schema(fields)
+    item["properties"] = {"document": {"type": "integer"}, **item["properties"]}
+    item["required"] = ["document", *item["required"]]
+    return {
+        "type": "object",
+        "properties": {"documents": {"type": "array", "items": item}},
+        "required": ["documents"],
+        "additionalProperties": False,
+    }
+
+
+def max_output_tokens(fields: list[str], count: int = 1) -> int:
+    """
+    Upper bound on the tokens needed to answer with `count` objects of these
+    fields, used as num_predict (never more than LLM_OUTPUT_TOKENS per object).
+    """
+    per_object = OBJECT_TOKENS + sum(
+        TOKENS_PER_FIELD + len(field) // OUTPUT_CHARS_PER_TOKEN + FIELD_SPECS[field]["max_chars"] // OUTPUT_CHARS_PER_TOKEN
+        for field in fields
+    )
+    return min(per_object, settings.LLM_OUTPUT_TOKENS) * count + OBJECT_TOKENS
+
+
+def generation_options(fields: list[str], count: int = 1) -> dict:
+    """Ollama options for a constrained extraction call."""
+    return {"num_ctx": settings.LLM_CONTEXT_TOKENS, "num_predict": max_output_tokens(fields, count)}
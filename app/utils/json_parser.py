@@ -1,22 +1,261 @@
 import re
 import json
 
-def parse_ai_json(ai_response: str):
+LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+JSON_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+KEY_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+GROUPED_NUMBER_RE = re.compile(r"-?\d{1,3}(?:,\d{3})+(?:\.\d+)?(?!\d)")
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class StreamingJSONParser:
+    """
+    Consumes LLM output as it streams and isolates the first top-level JSON
+    object: text before the opening brace (prose, ```json fences) is skipped,
+    brackets are balanced outside strings (double- or single-quoted), and
+    anything after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self.stack = []  # open brackets of the object so far
+        self.started = False
+        self.complete = False
+        self.quote = None  # delimiter of the string being read, if any
+        self.escaped = False
+        self.parts = []
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk of text; return True once the object is complete."""
+        if self.complete:
+            return True
+
+        start = 0
+        for i, ch in enumerate(chunk):
+            if not self.started:
+                if ch != "{":
+                    continue
+                self.started = True
+                start = i
+
+            if self.quote:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == self.quote:
+                    self.quote = None
+            elif ch in "\"'":
+                self.quote = ch
+            elif ch in CLOSERS:
+                self.stack.append(ch)
+            elif ch in "}]" and self.stack:
+                self.stack.pop()
+                if not self.stack:
+                    self.parts.append(chunk[start:i + 1])
+                    self.complete = True
+                    return True
+
+        if self.started:
+            self.parts.append(chunk[start:])
+        return False
+
+    @property
+    def text(self) -> str:
+        """The object text consumed so far (possibly unterminated)."""
+        return "".join(self.parts)
+
+    def result(self) -> dict:
+        """Parse the object, repairing common defects and closing it if the stream was cut off."""
+        if not self.started:
+            raise ValueError("No JSON object found in AI response.")
+        text = self.text
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        repaired = repair_json(text)
+        try:
+            return json.loads(repaired)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse JSON after repair: {e}\nRaw: {text[:300]}")
+
+
+# ==========================================================
+#  Repair
+# ==========================================================
+
+def _last_significant(out: list[str]) -> str:
+    for piece in reversed(out):
+        stripped = piece.rstrip()
+        if stripped:
+            return stripped[-1]
+    return ""
+
+
+def _drop_trailing_comma(out: list[str]):
+    while out and not out[-1].strip():
+        out.pop()
+    if out and out[-1].rstrip().endswith(","):
+        out[-1] = out[-1].rstrip()[:-1]
+
+
+def _read_string(text: str, i: int) -> tuple[str, int]:
+    """Read a '…' or "…" string starting at i; returns (JSON string literal, index after it)."""
+    quote = text[i]
+    j = i + 1
+    buf = []
+    while j < len(text):
+        c = text[j]
+        if c == "\\" and j + 1 < len(text):
+            nxt = text[j + 1]
+            buf.append("'" if nxt == "'" else c + nxt)
+            j += 2
+            continue
+        if c == quote:
+            if quote == "'" and text.startswith("''", j) and j > i + 1:
+                # 'it''s' — a doubled quote inside a single-quoted string
+                buf.append("'")
+                j += 2
+                continue
+            j += 1
+            break
+        if c == '"':
+            buf.append('\\"')
+        elif c == "\n":
+            buf.append("\\n")
+        elif c == "\t":
+            buf.append("\\t")
+        else:
+            buf.append(c)
+        j += 1
+    return '"' + "".join(buf) + '"', j
+
+
+def repair_json(text: str) -> str:
     """
-    Extract and clean valid JSON object from AI response.
-    Handles markdown fences like ```json ... ``` and returns a dict.
+    Single pass over a JSON-ish object fixing what small models commonly get
+    wrong: single-quoted strings, unquoted keys, bare (unquoted) values,
+    Python literals (None/True/False), // comments, missing commas between
+    members, trailing commas, and brackets left open by a truncated stream.
     """
-    # Remove Markdown-style fences like ```json ... ```
-    cleaned = re.sub(r"^```json|```$", "", ai_response.strip(), flags=re.MULTILINE).strip()
-    cleaned = re.sub(r"^```|```$", "", cleaned.strip(), flags=re.MULTILINE).strip()
+    out: list[str] = []
+    stack: list[str] = []
+    i, n = 0, len(text)
+
+    def separate():
+        # A value starting right after another value: the comma is missing
+        last = _last_significant(out)
+        if stack and (last in ('"', "}", "]") or last.isalnum()):
+            out.append(",")
+
+    while i < n:
+        ch = text[i]
+
+        if ch.isspace():
+            out.append(ch)
+            i += 1
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+        elif ch in "\"'":
+            separate()
+            literal, i = _read_string(text, i)
+            out.append(literal)
+        elif ch in CLOSERS:
+            separate()
+            stack.append(ch)
+            out.append(ch)
+            i += 1
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                out.append(CLOSERS[stack.pop()])
+            i += 1
+        elif ch in ",:":
+            out.append(ch)
+            i += 1
+        else:
+            # Bare token: unquoted key, literal, number or unquoted value
+            separate()
+            key = KEY_RE.match(text, i)
+            # "http://…" is a bare URL value, not a key followed by a // comment
+            if key and text[key.end():].lstrip().startswith(":") and not text.startswith("://", key.end()):
+                out.append(json.dumps(key.group()))
+                i = key.end()
+                continue
+            # A number ends at the next member ("1,234.5" keeps its thousands separators)
+            number = GROUPED_NUMBER_RE.match(text, i) or JSON_NUMBER_RE.match(text, i)
+            if number and text[number.end():].lstrip()[:1] in ("", '"', "'", ",", "}", "]"):
+                end = number.end()
+            else:
+                end = i
+                while end < n and text[end] not in ",}]\n":
+                    end += 1
+            token = text[i:end].strip()
+            if token in LITERALS:
+                out.append(LITERALS[token])
+            elif JSON_NUMBER_RE.fullmatch(token):
+                out.append(token)
+            else:
+                out.append(json.dumps(token))
+            i = end
+
+    # Truncated stream: finish a dangling member and close what is still open
+    if _last_significant(out) == ":":
+        out.append("null")
+    _drop_trailing_comma(out)
+    while stack:
+        out.append(CLOSERS[stack.pop()])
+    return "".join(out)
+
+
+# ==========================================================
+#  Parse + validate
+# ==========================================================
+
+def parse_ai_json(ai_response: str) -> dict:
+    """
+    Extract the first JSON object from an AI response and return it as a dict.
+    Prose, markdown fences and anything after the object are ignored;
+    malformed or truncated objects are repaired before giving up.
+    """
+    parser = StreamingJSONParser()
+    parser.feed(ai_response)
+    data = parser.result()
+    if not isinstance(data, dict):
+        raise ValueError("AI response JSON is not an object.")
+    return data
+
+
+def validate_fields(data: dict, fields: list[str]) -> tuple[dict, list[str]]:
+    """
+    Check a parsed object against the expected flat field schema.
+    Returns (values, failed_fields): every expected field is present in
+    values (None when it failed), lists of scalars are joined, and fields
+    that are missing or hold nested objects are reported as failed.
+    """
+    if fields and not any(f in data for f in fields):
+        # {"company": {...fields...}} — unwrap a single nested object
+        nested = [v for v in data.values() if isinstance(v, dict)]
+        if len(nested) == 1:
+            data = nested[0]
+
+    values, failed = {}, []
+    for field in fields:
+        value = data.get(field)
+        if field not in data:
+            failed.append(field)
+        elif isinstance(value, bool):
+            value = str(value).lower()
+        elif isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+            value = ", ".join(str(v) for v in value)
+        elif value is not None and not isinstance(value, (str, int, float)):
+            failed.append(field)
+            value = None
+        values[field] = value
+    return values, failed
 
-    # Extract the JSON object part
-    json_match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if not json_match:
-        raise ValueError("No JSON object found in AI response.")
 
-    json_str = json_match.group().strip()
-    try:
-        return json.loads(json_str)
-    except Exception as e:
-        raise ValueError(f"Failed to parse cleaned JSON: {e}\nRaw: {json_str[:300]}")
\ No newline at end of file
+def parse_ai_fields(ai_response: str, fields: list[str]) -> tuple[dict, list[str]]:
+    """parse_ai_json + validate_fields: (values for every expected field, fields that failed)."""
+    return validate_fields(parse_ai_json(ai_response), fields)
@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from app.core.config import settings
+
+# pytesseract and pdf2image (Pillow) are imported where they are used, so
+# importing this module costs nothing until a scanned page is OCR'd
+
+def get_page_count(file_path: str) -> int:
+    from pdf2image import pdfinfo_from_path
+    return int(pdfinfo_from_path(file_path)["Pages"])
+
+
+def _init_ocr_worker():
+    # Each worker already owns a core; stop Tesseract from spawning its own threads
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_page_range(file_path: str, first_page: int, last_page: int, dpi: int, lang: str) -> list[str]:
+    """
+    Rasterize and OCR a small run of pages inside a worker process.
+    Only these pages are ever held in memory.
+    """
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(file_path, dpi=dpi, first_page=first_page, last_page=last_page)
+    texts = []
+    for image in images:
+        texts.append(pytesseract.image_to_string(image, lang=lang))
+        image.close()
+    return texts
+
+
+def _group_pages(page_numbers: list[int], batch_size: int) -> list[tuple[int, int]]:
+    """Group sorted page numbers into consecutive (first, last) runs of at most batch_size pages."""
+    groups = []
+    for page in page_numbers:
+        if groups and page == groups[-1][1] + 1 and page - groups[-1][0] < batch_size:
+            groups[-1] = (groups[-1][0], page)
+        else:
+            groups.append((page, page))
+    return groups
+
+
+def ocr_pages(
+    file_path: str,
+    page_numbers: Optional[list[int]] = None,
+    dpi: Optional[int] = None,
+    workers: Optional[int] = None,
+    lang: Optional[str] = None
+) -> dict[int, str]:
+    """
+    OCR the given 1-based pages (all pages by default) with a process pool.
+    Pages are rasterized a few at a time inside the workers rather than all
+    up front, and the result maps page number → text in page order.
+    """
+    dpi = dpi or settings.OCR_DPI
+    workers = workers or settings.OCR_WORKERS or settings.pdf_worker_budget()
+    lang = lang or settings.OCR_LANG
+
+    if page_numbers is None:
+        page_numbers = list(range(1, get_page_count(file_path) + 1))
+    page_numbers = sorted(set(page_numbers))
+    if not page_numbers:
+        return {}
+
+    groups = _group_pages(page_numbers, max(1, settings.OCR_PAGES_PER_TASK))
+    results: dict[int, str] = {}
+
+    # Import once here so forked workers inherit the modules
+    import pytesseract  # noqa: F401
+    import pdf2image  # noqa: F401
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(groups)), initializer=_init_ocr_worker) as pool:
+        futures = [
+            pool.submit(_ocr_page_range, file_path, first, last, dpi, lang)
+            for first, last in groups
+        ]
+        for (first, _last), future in zip(groups, futures):
+            for offset, text in enumerate(future.result()):
+                results[first + offset] = text
+
+    return results
\ No newline at end of file
@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import math
+import uuid
+import hashlib
+from collections import Counter
+from typing import Callable, Optional
+from app.core.config import settings
+from app.core.storage import shard_key
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with",
+}
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def pages_fingerprint(pages: list[tuple[int, str]]) -> str:
+    sha = hashlib.sha256()
+    for page_number, text in pages:
+        sha.update(f"{page_number}\0{text}\0".encode("utf-8"))
+    return sha.hexdigest()
+
+
+class BM25Index:
+    """Okapi BM25 over the pages of one document."""
+
+    def __init__(self, page_numbers: list[int], term_freqs: list[dict], k1: float = 1.5, b: float = 0.75):
+        self.page_numbers = page_numbers
+        self.term_freqs = term_freqs
+        self.k1 = k1
+        self.b = b
+
+        self.lengths = [sum(tf.values()) for tf in term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freqs = Counter(term for tf in term_freqs for term in tf)
+        n = len(term_freqs)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()
+        }
+
+    @classmethod
+    def build(cls, pages: list[tuple[int, str]]) -> "BM25Index":
+        return cls(
+            page_numbers=[page_number for page_number, _ in pages],
+            term_freqs=[dict(Counter(tokenize(text))) for _, text in pages]
+        )
+
+    def scores(self, query: str) -> dict[int, float]:
+        """BM25 score of every page for the query, keyed by page number."""
+        terms = [t for t in tokenize(query) if t in self.idf]
+        result = {}
+        for page_number, tf, length in zip(self.page_numbers, self.term_freqs, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1.0))
+            for term in terms:
+                freq = tf.get(term, 0)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            result[page_number] = score
+        return result
+
+    def to_dict(self) -> dict:
+        return {"page_numbers": self.page_numbers, "term_freqs": self.term_freqs, "k1": self.k1, "b": self.b}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        return cls(data["page_numbers"], data["term_freqs"], data["k1"], data["b"])
+
+
+# ==========================================================
+#  Persistence (one index file per document, sharded, LRU-evicted)
+# ==========================================================
+
+def page_hashes_fingerprint(page_hashes: list[tuple[int, str]]) -> str:
+    """Fingerprint of a document's pages from their stored content hashes (no page text needed)."""
+    sha = hashlib.sha256()
+    for page_number, content_hash in page_hashes:
+        sha.update(f"{page_number}\0{content_hash}\0".encode("utf-8"))
+    return sha.hexdigest()
+
+
+def _index_path(document_id) -> str:
+    return os.path.join(settings.PAGE_INDEX_DIR, *shard_key(str(document_id), ".json").split("/"))
+
+
+def load_or_build_index(
+    document_id,
+    page_hashes: list[tuple[int, str]],
+    load_pages: Callable[[], list[tuple[int, str]]]
+) -> BM25Index:
+    """
+    Load the document's persisted index if it was built from the same page
+    hashes; otherwise build it from load_pages() (the only time page text is
+    read) and persist it.
+    """
+    fingerprint = page_hashes_fingerprint(page_hashes)
+    path = _index_path(document_id)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("fingerprint") == fingerprint:
+            # Touch so eviction treats this index as recently used
+            os.utime(path)
+            return BM25Index.from_dict(stored["index"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+
+    index = BM25Index.build(load_pages())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "index": index.to_dict()}, f)
+    os.replace(tmp_path, path)
+
+    _evict(keep=path)
+    return index
+
+
+def _evict(keep: Optional[str] = None):
+    """Delete least-recently-used index files until the directory fits PAGE_INDEX_MAX_BYTES."""
+    entries = []
+    total = 0
+    for root, _dirs, names in os.walk(settings.PAGE_INDEX_DIR):
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    for _mtime, size, path in sorted(entries):
+        if total <= settings.PAGE_INDEX_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+# ==========================================================
+#  Page selection
+# ==========================================================
+
+def select_relevant_pages(
+    document_id,
+    page_hashes: list[tuple[int, str]],
+    field_queries: dict[str, str],
+    load_pages: Callable[[], list[tuple[int, str]]],
+    top_k: Optional[int] = None,
+    always_include: tuple = ()
+) -> list[int]:
+    """
+    Page numbers of the top_k pages most relevant to the fields being
+    extracted. Every field first gets its single best page; remaining slots
+    go to the pages with the highest combined (per-field normalized) score.
+    Returned in page order. `page_hashes` is (page_number, content_hash) per
+    page; page text is only loaded (load_pages) when the index is rebuilt.
+    """
+    top_k = top_k or settings.RETRIEVAL_TOP_K
+    page_numbers = [page_number for page_number, _ in page_hashes]
+    if len(page_numbers) <= top_k:
+        return page_numbers
+
+    index = load_or_build_index(document_id, page_hashes, load_pages)
+    combined = Counter()
+    chosen = [p for p in always_include if p in index.page_numbers]
+
+    per_field_best = []
+    for query in field_queries.values():
+        scores = index.scores(query)
+        best_score = max(scores.values(), default=0.0)
+        if best_score <= 0:
+            continue
+        for page_number, score in scores.items():
+            combined[page_number] += score / best_score
+        best_page = max(scores, key=lambda p: (scores[p], -p))
+        per_field_best.append((best_score, best_page))
+
+    for _score, page_number in sorted(per_field_best, key=lambda x: (-x[0], x[1])):
+        if len(chosen) >= top_k:
+            break
+        if page_number not in chosen:
+            chosen.append(page_number)
+
+    for page_number, score in sorted(combined.items(), key=lambda x: (-x[1], x[0])):
+        if len(chosen) >= top_k or score <= 0:
+            break
+        if page_number not in chosen:
+            chosen.append(page_number)
+
+    if not chosen:
+        return page_numbers[:top_k]
+
+    return sorted(chosen)
@@ -1,67 +1,102 @@
 from fastapi import HTTPException
-import pdfplumber, camelot, pytesseract
-from pdf2image import convert_from_path
-from pathlib import Path
+from app.core.config import settings
+from app.core.storage import get_storage
+from app.utils.ocr_engine import ocr_pages
+from app.utils.table_extractor import detect_table_flavor, extract_tables
+from app.utils.extraction_cache import stream_sha256, get_cached_extraction, store_cached_extraction
 
-def extract_text_and_tables(file_path: str) -> str:
-    """Try text, then table, then OCR fallback"""
-    combined_text = ""
+# pdfplumber (pdfminer) is imported inside the functions that parse PDFs, so
+# routes that only read the database don't pay for it at startup
 
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    combined_text += text + "\n"
-
-        if not combined_text.strip():
-            print("⚠️ No text found — trying OCR...")
-            pages = convert_from_path(file_path)
-            for img in pages:
-                combined_text += pytesseract.image_to_string(img) + "\n"
+def page_needs_ocr(page) -> bool:
+    """
+    Decide from pdfplumber's character layer whether a page is scanned.
+    Pages with almost no text, or a page-sized image and very sparse text,
+    are sent to OCR.
+    """
+    text_chars = sum(1 for c in page.chars if not c["text"].isspace())
+    if text_chars < settings.OCR_MIN_PAGE_CHARS:
+        return True
 
-        # Optional: combine tables
-        tables = camelot.read_pdf(file_path, pages="all", flavor="stream")
-        for table in tables:
-            combined_text += "\n" + str(table.df)
-        print("Combined_text:",combined_text)
-        return combined_text
-    except Exception as e:
-        print(f"❌ PDF extraction failed: {e}")
-        return ""
+    page_area = float(page.width * page.height) or 1.0
+    image_area = sum(
+        (img["x1"] - img["x0"]) * (img["bottom"] - img["top"]) for img in page.images
+    )
+    chars_per_sq_inch = text_chars / (page_area / 72 ** 2)
+    return image_area / page_area > 0.5 and chars_per_sq_inch < settings.OCR_MIN_CHAR_DENSITY
 
 
-def extract_text_from_image_pdf(file_path: str) -> str:
+def extract_document(key: str, tables: bool = True) -> dict:
     """
-    Extract text from scanned image PDFs using OCR.
+    Extract text for every page of the stored PDF, in page order, OCR'ing
+    only the pages that have no usable text layer, plus structured tables.
+    Each page carries the method that produced it ("text" or "ocr").
+
+    Table pages are detected in the same pdfplumber pass (ruling lines /
+    numeric columns), so camelot only runs on candidate pages, in parallel.
+    The text layer is parsed through a storage view, so remote backends only
+    fetch the byte ranges pdfminer actually reads; the file is materialized
+    locally only when OCR or camelot is needed.
+    Module-level so it can be shipped to a worker process.
+    Returns {"pages": [...], "tables": [...]}.
     """
-    print(f"🧠 Starting OCR extraction for: {file_path}")
-    file = Path(file_path)
-    if not file.exists():
-        raise FileNotFoundError(f"PDF file not found: {file_path}")
+    import pdfplumber
 
-    all_text = ""
-    try:
-        pages = convert_from_path(file_path)
-        print(f"📄 Found {len(pages)} pages in PDF.")
+    storage = get_storage()
+    pages = []
+    scanned = []
+    candidates = {}
+    with storage.open_view(key) as view, pdfplumber.open(view) as pdf:
+        for page_number, page in enumerate(pdf.pages, start=1):
+            if page_needs_ocr(page):
+                scanned.append(page_number)
+                pages.append({"page_number": page_number, "text": "", "method": "ocr"})
+            else:
+                text = page.extract_text() or ""
+                pages.append({"page_number": page_number, "text": text, "method": "text"})
+                flavor = detect_table_flavor(page, text) if tables else None
+                if flavor:
+                    candidates[page_number] = flavor
 
-        for i, page in enumerate(pages, start=1):
-            print(f"🔍 Performing OCR on page {i}...")
-            text = pytesseract.image_to_string(page, lang="eng")
-            all_text += f"\n\n--- PAGE {i} ---\n{text}"
+    extracted_tables = []
+    if scanned or candidates:
+        with storage.local_path(key) as file_path:
+            if scanned:
+                print(f"⚠️ {len(scanned)} of {len(pages)} pages have no text layer — running OCR...")
+                ocr_text = ocr_pages(file_path, page_numbers=scanned)
+                for page_number in scanned:
+                    pages[page_number - 1]["text"] = ocr_text.get(page_number, "")
+            if candidates:
+                print(f"📊 {len(candidates)} of {len(pages)} pages look like tables — running camelot...")
+                extracted_tables = extract_tables(file_path, candidates)
 
-        print("✅ OCR extraction completed successfully.")
-        return all_text
+    return {"pages": pages, "tables": extracted_tables}
 
-    except Exception as e:
-        print(f"❌ OCR extraction failed: {e}")
-        return ""
-    
-def extract_preview_text(pdf_path: str, max_pages: int = 2) -> str:
+def extract_document_cached(key: str, content_hash: str = None) -> dict:
+    """
+    extract_document, backed by the content-addressed cache: a PDF whose bytes
+    were already parsed (e.g. the same report uploaded twice) is a lookup.
+    """
+    if not content_hash:
+        with get_storage().open(key) as f:
+            content_hash = stream_sha256(f)
+
+    cached = get_cached_extraction(content_hash)
+    if cached is not None:
+        return {"pages": cached["pages"], "tables": cached["tables"]}
+
+    extraction = extract_document(key)
+    store_cached_extraction(content_hash, extraction)
+    return extraction
+
+def extract_preview_text(pdf_path, max_pages: int = 2) -> str:
     """
     Extract text from the first few pages of the PDF for AI name detection.
     Used to generate a short context snippet for the LLM.
+    Accepts a path or a seekable binary stream.
     """
+    import pdfplumber
+
     text = ""
     try:
         with pdfplumber.open(pdf_path) as pdf:
@@ -70,4 +105,13 @@ def extract_preview_text(pdf_path: str, max_pages: int = 2) -> str:
                 text += page_text + "\n"
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading PDF: {e}")
-    return text.strip()
\ No newline at end of file
+    return text.strip()
+
+def extract_stored_preview_text(key: str, max_pages: int = 2) -> str:
+    """
+    extract_preview_text over the storage view of a stored PDF: a memory
+    map for local files (usually still in the page cache right after upload),
+    ranged reads for object storage.
+    """
+    with get_storage().open_view(key) as view:
+        return extract_preview_text(view, max_pages=max_pages)
\ No newline at end of file
@@ -1,37 +1,78 @@
+from app.utils.extraction_schema import FUND_COMPANY_SCHEMA, COMPANY_SCHEMA, FINANCIAL_SCHEMA
+
+FUND_COMPANY_FIELDS = list(FUND_COMPANY_SCHEMA)
+COMPANY_FIELDS = list(COMPANY_SCHEMA)
+FINANCIAL_FIELDS = list(FINANCIAL_SCHEMA)
+
+# Search terms used to find the pages each field is likely to be on
+COMPANY_FIELD_QUERIES = {
+    "company_name": "company name portfolio company overview",
+    "holding_company": "holding company parent group owned subsidiary",
+    "business_description": "business description overview operates provides products services",
+    "head_office_location": "head office headquarters headquartered location based",
+    "fund_role": "fund role lead investor co-investor sole investor",
+    "investment_type": "investment type primary secondary co-investment buyout growth",
+    "ownership_percent": "ownership stake equity interest holding percent shareholding",
+    "first_completion_date": "first completion date completed acquisition closing",
+    "transaction_value": "transaction value enterprise value purchase price consideration",
+    "current_cost": "current cost cost investment invested capital",
+    "fair_value": "fair value valuation unrealised multiple",
+}
+
+FINANCIAL_FIELD_QUERIES = {
+    "period": "financial highlights year ended fy period",
+    "currency": "currency usd eur gbp krw bn mn millions",
+    "revenue": "revenue sales turnover",
+    "ebitda": "ebitda",
+    "ebitda_margin": "ebitda margin",
+    "ebit": "ebit operating profit",
+    "ebit_margin": "ebit margin operating margin",
+    "net_profit_after_tax": "net profit after tax net income",
+    "capex": "capex capital expenditure",
+    "net_debt": "net debt borrowings leverage",
+}
+
+def _json_template(fields: list[str]) -> str:
+    return "{\n" + ",\n".join(f'  "{field}": ""' for field in fields) + "\n}"
+
 def build_fund_company_prompt(preview_text: str) -> str:
     """AI prompt to extract fund and company names."""
     return f"""
 You are an AI that extracts key identifying information from investment reports.
 
 Extract ONLY the fund and company names in valid JSON format:
-{{
-  "fund_name": "",
-  "company_name": ""
-}}
+{_json_template(FUND_COMPANY_FIELDS)}
 
 Text:
 {preview_text}
 """
 
+def build_fund_company_batch_prompt(previews: list[str]) -> str:
+    """AI prompt to extract fund and company names for several documents at once."""
+    sections = "\n\n".join(
+        f"--- DOCUMENT {i} ---\n{text}" for i, text in enumerate(previews, start=1)
+    )
+    return f"""
+You are an AI that extracts key identifying information from investment reports.
+
+For EACH document below, extract ONLY the fund and company names.
+Return a single valid JSON object with one entry per document, in order:
+{{
+  "documents": [
+    {{"document": 1, "fund_name": "", "company_name": ""}}
+  ]
+}}
+
+{sections}
+"""
+
 def build_company_prompt(raw_text: str) -> str:
     return f"""
 You are a strict data extraction AI.
 Return ONLY a single valid JSON object. No explanations, no markdown, no text outside JSON.
 
 Extract these fields from the report:
-{{
-  "company_name": "",
-  "holding_company": "",
-  "business_description": "",
-  "head_office_location": "",
-  "fund_role": "",
-  "investment_type": "",
-  "ownership_percent": "",
-  "first_completion_date": "",
-  "transaction_value": "",
-  "current_cost": "",
-  "fair_value": ""
-}}
+{_json_template(COMPANY_FIELDS)}
 
 Do not include words like 'Here is' or 'Sure'.
 Only output valid JSON.
@@ -40,27 +81,17 @@ Text:
 {raw_text}
 """
 
-def build_financial_prompt(raw_text: str) -> str:
+def build_financial_prompt(raw_text: str, fields: list[str] = FINANCIAL_FIELDS) -> str:
+    """Pass `fields` to ask only for the fields the rule-based pass could not resolve."""
     return f"""
 You are an AI that extracts company financial highlights from an annual report.
 
 Extract ONLY these fields in valid JSON format:
-{{
-  "period": "",
-  "currency": "",
-  "revenue": "",
-  "ebitda": "",
-  "ebitda_margin": "",
-  "ebit": "",
-  "ebit_margin": "",
-  "net_profit_after_tax": "",
-  "capex": "",
-  "net_debt": ""
-}}
+{_json_template(fields)}
 
 Use only exact numbers from the text below. Do not guess.
 Output valid JSON only.
 
 Text:
 \"\"\"{raw_text}\"\"\"
-"""
\ No newline at end of file
+"""
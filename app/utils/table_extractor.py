@@ -0,0 +1,112 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from app.core.config import settings
+
+NUMBER_TOKEN_RE = re.compile(r"\(?-?[$€£]?\d[\d,.]*%?\)?")
+
+# ==========================================================
+#  1. Cheap candidate detection (pdfplumber, no camelot)
+# ==========================================================
+
+def detect_table_flavor(page, text: str) -> Optional[str]:
+    """
+    Decide from an already-open pdfplumber page whether it is worth running
+    camelot on it, and with which flavor:
+    - "lattice" when the page has a grid of ruling lines,
+    - "stream" when it has horizontal rules or enough rows of numeric columns,
+    - None otherwise (the page is skipped).
+    """
+    min_width = float(page.width) * 0.2
+    min_height = float(page.height) * 0.02
+    horizontal = sum(1 for e in page.horizontal_edges if e["x1"] - e["x0"] >= min_width)
+    vertical = sum(1 for e in page.vertical_edges if e["bottom"] - e["top"] >= min_height)
+
+    if horizontal >= settings.TABLE_MIN_RULINGS and vertical >= settings.TABLE_MIN_RULINGS:
+        return "lattice"
+    if horizontal >= settings.TABLE_MIN_RULINGS:
+        return "stream"
+
+    numeric_rows = sum(
+        1 for line in text.splitlines()
+        if len(NUMBER_TOKEN_RE.findall(line)) >= settings.TABLE_MIN_NUMERIC_COLUMNS
+    )
+    if numeric_rows >= settings.TABLE_MIN_NUMERIC_ROWS:
+        return "stream"
+    return None
+
+
+# ==========================================================
+#  2. Camelot on candidate pages only (process pool)
+# ==========================================================
+
+def _camelot():
+    # camelot pulls in OpenCV, pandas and matplotlib: load it on first use, not with the API
+    import camelot
+    return camelot
+
+
+def _clean_rows(df) -> list[list[str]]:
+    """DataFrame → list of rows of stripped strings, without fully empty rows/columns."""
+    rows = [[str(cell).strip() for cell in row] for row in df.values.tolist()]
+    rows = [row for row in rows if any(row)]
+    if not rows:
+        return []
+    keep = [i for i in range(len(rows[0])) if any(row[i] for row in rows)]
+    return [[row[i] for i in keep] for row in rows]
+
+
+def _read_page_tables(file_path: str, page_number: int, flavor: str) -> list[dict]:
+    """Run camelot on a single page inside a worker process."""
+    camelot = _camelot()
+    try:
+        tables = camelot.read_pdf(file_path, pages=str(page_number), flavor=flavor)
+    except Exception as e:
+        print(f"⚠️ Table extraction failed on page {page_number}: {e}")
+        return []
+
+    results = []
+    for table in tables:
+        rows = _clean_rows(table.df)
+        if len(rows) < 2:
+            continue
+        results.append({
+            "page_number": page_number,
+            "table_index": len(results),
+            "flavor": flavor,
+            "n_rows": len(rows),
+            "n_cols": max(len(row) for row in rows),
+            "accuracy": table.parsing_report.get("accuracy"),
+            "rows": rows
+        })
+    return results
+
+
+def extract_tables(
+    file_path: str,
+    candidates: dict[int, str],
+    workers: Optional[int] = None
+) -> list[dict]:
+    """
+    Extract tables from the candidate pages ({page_number: flavor}) only,
+    one page per task. Returns structured tables in page order.
+    """
+    if not candidates:
+        return []
+
+    page_numbers = sorted(candidates)
+    if len(page_numbers) == 1:
+        # Not worth starting a pool for a single page
+        return _read_page_tables(file_path, page_numbers[0], candidates[page_numbers[0]])
+
+    workers = workers or settings.TABLE_WORKERS or settings.pdf_worker_budget()
+    tables = []
+    _camelot()  # import once here so forked workers inherit it
+    with ProcessPoolExecutor(max_workers=min(workers, len(page_numbers))) as pool:
+        futures = [
+            pool.submit(_read_page_tables, file_path, page_number, candidates[page_number])
+            for page_number in page_numbers
+        ]
+        for future in futures:
+            tables.extend(future.result())
+    return tables
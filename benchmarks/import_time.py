@@ -0,0 +1,94 @@
+"""
+Import time of the API and CLI entry points, and a guard that the PDF
+engines (pdfplumber, camelot, pytesseract, pdf2image and what they pull in)
+are not loaded until a PDF is actually parsed.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --budget-ms 1500
+
+Each import runs in a fresh interpreter (`python -X importtime`). Exits
+non-zero if a heavy module is imported at startup or the median import time
+of an entry point exceeds --budget-ms, so it can run in CI.
+"""
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ENTRY_POINTS = ["app.main", "app.cli"]
+HEAVY_MODULES = ["pdfplumber", "pdfminer", "camelot", "cv2", "pandas", "matplotlib", "pytesseract", "pdf2image", "PIL"]
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    # create_engine does not connect, so no database is touched; settings just need a URL
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'import_bench.sqlite3')}")
+    return env
+
+
+def measure(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """(total ms, [(self ms, top-level package)]) for one cold import, slowest packages first."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    total, packages = 0.0, {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        own, cumulative = int(match.group(1)) / 1000, int(match.group(2)) / 1000
+        depth, name = len(match.group(3)), match.group(4)
+        if depth == 0:
+            total += cumulative
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + own
+    return total, sorted(((ms, name) for name, ms in packages.items()), reverse=True)
+
+
+def loaded_heavy_modules(module: str) -> list[str]:
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return result.stdout.split()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Max median import time per entry point")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level packages to list")
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_POINTS:
+        runs = [measure(module) for _ in range(args.runs)]
+        median = statistics.median(total for total, _ in runs)
+        print(f"\nimport {module}: median {median:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+        for ms, package in runs[-1][1][:args.top]:
+            print(f"  {package:<24} {ms:8.1f} ms")
+
+        heavy = loaded_heavy_modules(module)
+        if heavy:
+            print(f"  ❌ heavy modules imported at startup: {', '.join(heavy)}")
+            failed = True
+        if median > args.budget_ms:
+            print("  ❌ over budget")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Idempotent schema operations for revisions that must also apply to
+databases created by the old create_all startup, where some tables,
+columns or indexes may already exist. In offline (--sql) mode nothing
+can be inspected and every object is assumed to be missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+def _inspector():
+    if op.get_context().as_sql:
+        return None
+    return sa.inspect(op.get_bind())
+
+
+def has_table(table: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(table) and any(
+        c["name"] == column for c in inspector.get_columns(table)
+    )
+
+
+def has_index(table: str, index: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(table) and any(
+        i["name"] == index for i in inspector.get_indexes(table)
+    )
+
+
+def create_table_if_missing(table: str, *columns, **kw):
+    if not has_table(table):
+        op.create_table(table, *columns, **kw)
+
+
+def add_column_if_missing(table: str, column: sa.Column):
+    if not has_column(table, column.name):
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(column)
+
+
+def create_index_if_missing(index: str, table: str, columns: list[str], unique: bool = False):
+    if not has_index(table, index):
+        op.create_index(index, table, columns, unique=unique)
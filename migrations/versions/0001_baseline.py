@@ -0,0 +1,95 @@
+"""baseline: funds, companies, investments, financials, documents, extracted fields, corrections
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_table_if_missing
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table_if_missing(
+        "fund",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        "company",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("holding_company", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("head_office_location", sa.String(), nullable=True),
+    )
+    create_table_if_missing(
+        "investment",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("fund_id", sa.Uuid(), sa.ForeignKey("fund.id"), nullable=True),
+        sa.Column("company_id", sa.Uuid(), sa.ForeignKey("company.id"), nullable=True),
+        sa.Column("fund_role", sa.String(), nullable=True),
+        sa.Column("investment_type", sa.String(), nullable=True),
+        sa.Column("ownership_percent", sa.Float(), nullable=True),
+        sa.Column("board_members", sa.String(), nullable=True),
+        sa.Column("date_of_first_completion", sa.Date(), nullable=True),
+        sa.Column("transaction_value", sa.Numeric(), nullable=True),
+        sa.Column("current_cost", sa.Numeric(), nullable=True),
+        sa.Column("fair_value", sa.Numeric(), nullable=True),
+    )
+    create_table_if_missing(
+        "financial_highlight",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("company_id", sa.Uuid(), sa.ForeignKey("company.id"), nullable=False),
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("revenue", sa.Numeric(), nullable=True),
+        sa.Column("ebitda", sa.Numeric(), nullable=True),
+        sa.Column("ebitda_margin", sa.Numeric(), nullable=True),
+        sa.Column("ebit", sa.Numeric(), nullable=True),
+        sa.Column("ebit_margin", sa.Numeric(), nullable=True),
+        sa.Column("net_profit_after_tax", sa.Numeric(), nullable=True),
+        sa.Column("capex", sa.Numeric(), nullable=True),
+        sa.Column("net_debt", sa.Numeric(), nullable=True),
+    )
+    create_table_if_missing(
+        "document",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("fund_id", sa.Uuid(), sa.ForeignKey("fund.id"), nullable=True),
+        sa.Column("company_id", sa.Uuid(), sa.ForeignKey("company.id"), nullable=True),
+        sa.Column("file_name", sa.String(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("uploaded_at", sa.DateTime(), nullable=False),
+    )
+    create_table_if_missing(
+        "extracted_field",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("document_id", sa.Uuid(), sa.ForeignKey("document.id"), nullable=False),
+        sa.Column("field_name", sa.String(), nullable=False),
+        sa.Column("extracted_value", sa.String(), nullable=True),
+        sa.Column("page_number", sa.Integer(), nullable=True),
+        sa.Column("source_text", sa.String(), nullable=True),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    create_table_if_missing(
+        "correction",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("extracted_field_id", sa.Uuid(), sa.ForeignKey("extracted_field.id"), nullable=False),
+        sa.Column("corrected_value", sa.String(), nullable=False),
+        sa.Column("corrected_by_user", sa.String(), nullable=True),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("corrected_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    for table in ("correction", "extracted_field", "document", "financial_highlight", "investment", "company", "fund"):
+        op.drop_table(table)
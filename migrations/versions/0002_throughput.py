@@ -0,0 +1,154 @@
+"""throughput: content hashes, extraction methods, entity upsert keys, jobs, runs and tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, create_index_if_missing, create_table_if_missing
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of app.services.entity_index.normalize_name as of this revision:
+# later changes to the app's normalizer must not change what this migration writes.
+LEGAL_SUFFIXES = {
+    "ltd", "limited", "inc", "incorporated", "llc", "llp", "lp", "plc", "co", "corp",
+    "corporation", "company", "gmbh", "ag", "sa", "sas", "bv", "nv", "pte", "pty", "spa", "ab", "kk",
+}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+PARENTHETICAL_RE = re.compile(r"\(([^)]*)\)")
+
+
+def _tokens(text: str) -> list[str]:
+    text = text.lower().replace("&", " and ")
+    tokens = []
+    initials = False
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if len(token) == 1 and token.isalpha():
+            if initials:
+                tokens[-1] += token
+            else:
+                tokens.append(token)
+            initials = text.startswith(".", match.end())
+            continue
+        initials = False
+        tokens.append(token)
+    return tokens
+
+
+def normalize_name(name: str) -> str:
+    tokens = _tokens(PARENTHETICAL_RE.sub(" ", name or ""))
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def _backfill_normalized_names(table: str):
+    """First row per normalized name gets the key; later duplicates stay NULL (still matched by the name index)."""
+    context = op.get_context()
+    if context.as_sql:
+        # SQL generated from base targets an empty database: nothing to backfill.
+        # From a later revision the existing rows need Python normalization.
+        if context.get_current_heads():
+            raise RuntimeError(
+                f"Revision {revision} backfills {table}.normalized_name and cannot run offline (--sql) "
+                f"against an existing database; apply it online with `python -m app.cli migrate --revision {revision}`."
+            )
+        return
+
+    bind = op.get_bind()
+    entities = sa.table(table, sa.column("id", sa.Uuid()), sa.column("name"), sa.column("normalized_name"))
+    taken = {row.normalized_name for row in bind.execute(sa.select(entities.c.normalized_name)) if row.normalized_name}
+    rows = bind.execute(sa.select(entities.c.id, entities.c.name).where(entities.c.normalized_name.is_(None)))
+    updates = []
+    for entity_id, name in rows:
+        key = normalize_name(name)
+        if key not in taken:
+            taken.add(key)
+            updates.append({"entity_id": entity_id, "key": key})
+    if updates:
+        bind.execute(
+            entities.update().where(entities.c.id == sa.bindparam("entity_id")).values(normalized_name=sa.bindparam("key")),
+            updates
+        )
+
+
+def upgrade():
+    add_column_if_missing("document", sa.Column("content_hash", sa.String(), nullable=True))
+    create_index_if_missing("ix_document_content_hash", "document", ["content_hash"])
+
+    add_column_if_missing("extracted_field", sa.Column("extraction_method", sa.String(), nullable=True))
+    add_column_if_missing("extracted_field", sa.Column("content_hash", sa.String(), nullable=True))
+
+    for table in ("fund", "company"):
+        add_column_if_missing(table, sa.Column("normalized_name", sa.String(), nullable=True))
+        _backfill_normalized_names(table)
+        create_index_if_missing(f"ix_{table}_normalized_name", table, ["normalized_name"], unique=True)
+
+    create_table_if_missing(
+        "extraction_job",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("document_id", sa.Uuid(), sa.ForeignKey("document.id"), nullable=False),
+        sa.Column("job_type", sa.String(), nullable=False),
+        sa.Column("use_cache", sa.Boolean(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("result", sa.String(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+
+    create_table_if_missing(
+        "extraction_run",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("document_id", sa.Uuid(), sa.ForeignKey("document.id"), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("input_fingerprint", sa.String(), nullable=False),
+        sa.Column("result", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    create_index_if_missing("ix_extraction_run_document_id", "extraction_run", ["document_id"])
+
+    create_table_if_missing(
+        "extracted_table",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("document_id", sa.Uuid(), sa.ForeignKey("document.id"), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=False),
+        sa.Column("table_index", sa.Integer(), nullable=False),
+        sa.Column("flavor", sa.String(), nullable=False),
+        sa.Column("n_rows", sa.Integer(), nullable=False),
+        sa.Column("n_cols", sa.Integer(), nullable=False),
+        sa.Column("rows", sa.String(), nullable=False),
+        sa.Column("accuracy", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    create_index_if_missing("ix_extracted_table_document_id", "extracted_table", ["document_id"])
+
+
+def downgrade():
+    op.drop_table("extracted_table")
+    op.drop_table("extraction_run")
+    op.drop_table("extraction_job")
+    for table in ("fund", "company"):
+        op.drop_index(f"ix_{table}_normalized_name", table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("normalized_name")
+    with op.batch_alter_table("extracted_field") as batch:
+        batch.drop_column("content_hash")
+        batch.drop_column("extraction_method")
+    op.drop_index("ix_document_content_hash", table_name="document")
+    with op.batch_alter_table("document") as batch:
+        batch.drop_column("content_hash")
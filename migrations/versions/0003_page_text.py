@@ -0,0 +1,82 @@
+"""page_text: page text out of extracted_field, composite lookup indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_if_missing, create_table_if_missing, has_column
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Newest raw_text row per page (ties broken by id); pages already in page_text are kept.
+# extracted_field ids are reused as page_text ids.
+MOVE_PAGE_TEXT = """
+INSERT INTO page_text (id, document_id, page_number, text, extraction_method, content_hash, created_at)
+SELECT ef.id, ef.document_id, ef.page_number, COALESCE(ef.extracted_value, ''),
+       ef.extraction_method, ef.content_hash, ef.created_at
+FROM extracted_field ef
+WHERE ef.field_name = 'raw_text'
+  AND ef.page_number IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM extracted_field newer
+      WHERE newer.document_id = ef.document_id
+        AND newer.field_name = 'raw_text'
+        AND newer.page_number = ef.page_number
+        AND (newer.created_at > ef.created_at OR (newer.created_at = ef.created_at AND newer.id > ef.id))
+  )
+  AND NOT EXISTS (
+      SELECT 1 FROM page_text pt
+      WHERE pt.document_id = ef.document_id AND pt.page_number = ef.page_number
+  )
+"""
+
+# Rows a correction points at stay in extracted_field
+DELETE_RAW_TEXT = """
+DELETE FROM extracted_field
+WHERE field_name = 'raw_text'
+  AND NOT EXISTS (SELECT 1 FROM correction c WHERE c.extracted_field_id = extracted_field.id)
+"""
+
+
+def upgrade():
+    create_table_if_missing(
+        "page_text",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("document_id", sa.Uuid(), sa.ForeignKey("document.id"), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("extraction_method", sa.String(), nullable=True),
+        sa.Column("content_hash", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("document_id", "page_number", name="uq_page_text_document_page"),
+    )
+
+    offline = op.get_context().as_sql
+    if offline or has_column("extracted_field", "content_hash"):
+        op.execute(MOVE_PAGE_TEXT)
+        op.execute(DELETE_RAW_TEXT)
+        with op.batch_alter_table("extracted_field") as batch:
+            batch.drop_column("content_hash")
+
+    create_index_if_missing("ix_extracted_field_document_page", "extracted_field", ["document_id", "page_number"])
+    create_index_if_missing("ix_extracted_field_document_field", "extracted_field", ["document_id", "field_name"])
+
+
+def downgrade():
+    op.drop_index("ix_extracted_field_document_field", table_name="extracted_field")
+    op.drop_index("ix_extracted_field_document_page", table_name="extracted_field")
+    with op.batch_alter_table("extracted_field") as batch:
+        batch.add_column(sa.Column("content_hash", sa.String(), nullable=True))
+    op.execute(
+        "INSERT INTO extracted_field (id, document_id, field_name, extracted_value, page_number, source_text, "
+        "extraction_method, content_hash, created_at) "
+        "SELECT id, document_id, 'raw_text', text, page_number, text, extraction_method, content_hash, created_at "
+        "FROM page_text"
+    )
+    op.drop_table("page_text")
@@ -0,0 +1,22 @@
+"""document: (uploaded_at, id) index for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+from migrations.helpers import create_index_if_missing
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index_if_missing("ix_document_uploaded_at_id", "document", ["uploaded_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_document_uploaded_at_id", table_name="document")
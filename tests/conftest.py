@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings and the engine are read at import time: point them at a scratch
+# SQLite database and cache directories before anything from app is imported.
+_TMP = tempfile.mkdtemp(prefix="extraction-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'test.sqlite3')}")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("STORAGE_LOCAL_ROOT", os.path.join(_TMP, "storage"))
+os.environ.setdefault("PAGE_INDEX_DIR", os.path.join(_TMP, "page_index"))
+os.environ.setdefault("EXTRACTION_CACHE_DIR", os.path.join(_TMP, "extraction"))
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_TMP, "llm_cache.sqlite3"))
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The app engine, with the schema migrated to head once per test run."""
+    from alembic import command
+    from alembic.config import Config
+    from app.core.database import ALEMBIC_INI, engine
+
+    command.upgrade(Config(ALEMBIC_INI), "head")
+    return engine
+
+
+@pytest.fixture
+def session(engine):
+    from sqlmodel import Session
+
+    with Session(engine) as session:
+        yield session
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app.services.chunked_extraction import _reduce_responses, is_empty, merge_chunk_results
+from app.utils.chunker import chunk_pages
+
+FIELDS = ["revenue", "ebitda", "ceo"]
+
+
+def _chunks(*texts) -> list[dict]:
+    """One chunk per page."""
+    return [chunk_pages([(n, text)], max_tokens=1000)[0] for n, text in enumerate(texts, start=1)]
+
+
+@pytest.mark.parametrize("value", [None, "", " N/A ", "-", "not found", [], {}])
+def test_empty_values(value):
+    assert is_empty(value)
+
+
+def test_value_found_in_its_chunk_beats_an_earlier_unsupported_one():
+    chunks = _chunks("Revenue was strong.", "Revenue 1,234 for FY23")
+    merged, provenance = merge_chunk_results(
+        [(chunks[0], {"revenue": "999"}), (chunks[1], {"revenue": "1,234"})], FIELDS
+    )
+    assert merged["revenue"] == "1,234"
+    assert provenance["revenue"] == {"page_number": 2, "confidence": 0.9}
+
+
+def test_agreeing_chunks_beat_a_single_conflicting_one():
+    chunks = _chunks("EBITDA 200", "ebitda 250", "EBITDA  250 again")
+    merged, provenance = merge_chunk_results(
+        [(chunks[0], {"ebitda": "200"}), (chunks[1], {"ebitda": "250"}), (chunks[2], {"ebitda": "250"})], FIELDS
+    )
+    assert merged["ebitda"] == "250"
+    assert provenance["ebitda"]["page_number"] == 2  # the earliest of the agreeing chunks
+
+
+def test_ties_go_to_the_earliest_chunk_and_empty_values_never_win():
+    chunks = _chunks("CEO Jane Doe", "CEO John Roe", "CEO unknown")
+    merged, provenance = merge_chunk_results(
+        [(chunks[0], {"ceo": "Jane Doe"}), (chunks[1], {"ceo": "John Roe"}), (chunks[2], {"ceo": "unknown"})], FIELDS
+    )
+    assert merged == {"revenue": None, "ebitda": None, "ceo": "Jane Doe"}
+    assert set(provenance) == {"ceo"}
+
+
+def test_provenance_points_at_the_page_inside_a_multi_page_chunk():
+    [chunk] = chunk_pages([(4, "Overview"), (5, "Revenue reached 1,234")], max_tokens=1000)
+    _, provenance = merge_chunk_results([(chunk, {"revenue": "1,234"})], FIELDS)
+    assert provenance["revenue"]["page_number"] == 5
+
+
+def test_failed_chunks_are_skipped_and_all_failing_raises():
+    chunks = _chunks("Revenue 1,234", "Revenue 1,300")
+    merged, _ = _reduce_responses(chunks, [TimeoutError("slow"), json.dumps({"revenue": "1,300"})], FIELDS)
+    assert merged["revenue"] == "1,300"
+
+    with pytest.raises(TimeoutError):
+        _reduce_responses(chunks, [TimeoutError("slow"), "not json"], FIELDS)
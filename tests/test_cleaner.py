@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+
+from app.utils.cleaner import absolute_value, normalize_number, normalize_numbers, parse_currency_label, rescale
+
+
+@pytest.mark.parametrize("raw, value, currency, scale", [
+    ("$4.2bn", "4.2", "USD", "bn"),
+    ("US$ 1,234.5 million", "1234.5", "USD", "m"),
+    ("KRW 12.3 tn", "12.3", "KRW", "tn"),
+    ("€350k", "350", "EUR", "k"),
+    ("1\u00a0234\u00a0567", "1234567", None, None),
+    ("1\u202f234.5", "1234.5", None, None),
+    ("2,500 USD m", "2500", "USD", "m"),
+])
+def test_amounts(raw, value, currency, scale):
+    number = normalize_number(raw)
+    assert number["value"] == Decimal(value)
+    assert (number["currency"], number["scale"]) == (currency, scale)
+
+
+@pytest.mark.parametrize("raw, value, scale", [
+    ("(12.3)", "-12.3", None),
+    ("-5", "-5", None),
+    ("−7.5m", "-7.5", "m"),
+    ("($3.4m)", "-3.4", "m"),
+    ("$ (3.4) m", "-3.4", "m"),
+    ("USD (1,234) bn", "-1234", "bn"),
+])
+def test_negatives(raw, value, scale):
+    number = normalize_number(raw)
+    assert number["value"] == Decimal(value)
+    assert number["scale"] == scale
+
+
+def test_scale_after_parenthesis_needs_a_word_boundary():
+    number = normalize_number("(3.4) margin")
+    assert number["value"] == Decimal("-3.4")
+    assert number["scale"] is None
+
+
+@pytest.mark.parametrize("raw, unit", [("65%", "%"), ("12.5 pct", "%"), ("3.2x", "x")])
+def test_units(raw, unit):
+    number = normalize_number(raw)
+    assert number["unit"] == unit
+    assert number["scale"] is None
+
+
+@pytest.mark.parametrize("raw", [None, "", "n/a", "N.M.", "—", "unknown", "no figure"])
+def test_missing_values_are_none_not_zero(raw):
+    assert normalize_number(raw)["value"] is None
+
+
+def test_leading_year_is_skipped():
+    assert normalize_number("FY2023 revenue: 1,234")["value"] == Decimal("1234")
+    assert normalize_number("2023")["value"] == Decimal("2023")
+
+
+def test_scale_from_label_elsewhere_in_string():
+    number = normalize_number("1,234.5 (USD m)")
+    assert (number["value"], number["currency"], number["scale"]) == (Decimal("1234.5"), "USD", "m")
+
+
+def test_numeric_inputs_and_batch_order():
+    results = normalize_numbers([1.5, "n/a", 3, "1.5"])
+    assert [r["value"] for r in results] == [Decimal("1.5"), None, Decimal("3"), Decimal("1.5")]
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("KRW bn", ("KRW", "bn")),
+    ("€m", ("EUR", "m")),
+    ("USD '000", ("USD", "k")),
+    ("revenue", (None, None)),
+])
+def test_parse_currency_label(label, expected):
+    assert parse_currency_label(label) == expected
+
+
+def test_rescale_and_absolute_value():
+    number = normalize_number("USD 1.2bn")
+    assert rescale(number, "m") == Decimal("1200")
+    assert rescale(number, None) == Decimal("1.2")
+    assert absolute_value(normalize_number("$4.2 billion")) == Decimal("4200000000")
+    assert absolute_value(normalize_number("n/a")) is None
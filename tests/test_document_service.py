@@ -0,0 +1,97 @@
+import asyncio
+import base64
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.models.document import Document
+from app.models.fund import Fund
+from app.services import document_service
+from app.services.document_service import decode_cursor, list_documents_page
+
+
+@pytest.fixture
+def fake_detection(monkeypatch):
+    calls = []
+
+    async def generate(prompt, **kw):
+        calls.append(prompt)
+        return json.dumps({"fund_name": "Upload Test Fund II", "company_name": "Upload Test Holdings"})
+
+    monkeypatch.setattr(document_service, "call_ollama_async", generate)
+    monkeypatch.setattr(document_service, "extract_stored_preview_text", lambda key: "Quarterly report")
+    return calls
+
+
+def _upload(session, content: bytes, name: str = "report.pdf"):
+    file = UploadFile(io.BytesIO(content), filename=name)
+    return asyncio.run(document_service.save_document_to_db(file, session))
+
+
+def test_upload_detects_entities_and_reuses_them_for_the_same_bytes(session, fake_detection):
+    first = _upload(session, b"%PDF-1.4 upload test\n%%EOF")
+    second = _upload(session, b"%PDF-1.4 upload test\n%%EOF", "copy.pdf")
+
+    assert len(fake_detection) == 1  # the re-upload reuses the first document's links
+    assert first.fund_id and first.company_id
+    assert (second.fund_id, second.company_id, second.content_hash) == (
+        first.fund_id, first.company_id, first.content_hash
+    )
+    assert second.id != first.id
+
+
+def test_upload_rejects_non_pdf(session):
+    with pytest.raises(Exception) as error:
+        _upload(session, b"hello", "notes.txt")
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def fund_documents(session):
+    """Seven documents of one fund; four share an upload time so ties straddle page boundaries."""
+    fund = Fund(name=f"Paging Fund {uuid.uuid4()}")
+    session.add(fund)
+    start = datetime(2026, 1, 1, 12, 0)
+    times = [start, start, start, start, start - timedelta(hours=1), start + timedelta(hours=1), start - timedelta(days=1)]
+    documents = [
+        Document(id=uuid.uuid4(), file_name=f"{n}.pdf", file_path=f"{n}.pdf", fund_id=fund.id, uploaded_at=uploaded_at)
+        for n, uploaded_at in enumerate(times)
+    ]
+    session.add_all(documents)
+    session.commit()
+    return fund, sorted(documents, key=lambda d: (d.uploaded_at, d.id), reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 8])
+def test_pages_cover_every_document_once_in_order(session, fund_documents, limit):
+    fund, expected = fund_documents
+    seen, cursor = [], None
+    while True:
+        documents, cursor = list_documents_page(session, limit=limit, cursor=cursor, fund_id=fund.id)
+        assert len(documents) <= limit
+        seen.extend(d.id for d in documents)
+        if cursor is None:
+            break
+    assert seen == [d.id for d in expected]
+
+
+def test_cursor_round_trips(fund_documents):
+    _, documents = fund_documents
+    cursor = document_service.encode_cursor(documents[0])
+    assert decode_cursor(cursor) == (documents[0].uploaded_at, documents[0].id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"2026-01-01T12:00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"2026-01-01T12:00:00|not-a-uuid").decode(),
+])
+def test_malformed_cursor_is_a_bad_request(session, cursor):
+    with pytest.raises(HTTPException) as error:
+        list_documents_page(session, cursor=cursor)
+    assert error.value.status_code == 400
@@ -0,0 +1,88 @@
+import random
+import string
+
+import pytest
+
+from app.services.entity_index import NameIndex, _trigrams, name_aliases, normalize_name
+
+
+@pytest.fixture
+def index():
+    index = NameIndex()
+    index.add(1, "Blue Harbor Capital Fund III")
+    index.add(2, "Samsung Electronics Co., Ltd.")
+    index.add(3, "Meridian Ridge Partners")
+    index.add(4, "Meridian Ridge Partnors")
+    index.add(5, "Apple")
+    index.add(6, "Unknown Company")
+    return index
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Samsung Electronics Co., Ltd.", "samsung electronics"),
+    ("The Carlyle Group L.P.", "carlyle group"),
+    ("Fund I L.P.", "fund i"),
+    ("Acme & Sons (Holdings) Pty Ltd", "acme and sons"),
+    ("Limited", "limited"),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+def test_parenthetical_short_name_is_an_alias():
+    assert "apollo growth" in name_aliases("Apollo Global Management (Apollo Growth)")
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Samsung Electronics", (2, "Samsung Electronics Co., Ltd.", 1.0)),
+    ("Blue Harbor Capital Fund III L.P.", (1, "Blue Harbor Capital Fund III", 1.0)),
+    ("Blue Harbour Capital Fund III", (1, "Blue Harbor Capital Fund III", 0.844)),
+    ("Meridian Ridge Partnerz", (3, "Meridian Ridge Partners", 0.84)),
+])
+def test_match_name(index, name, expected):
+    assert index.match_name(name, threshold=0.8) == expected
+
+
+@pytest.mark.parametrize("name", ["Blue Harbor Capital Fund IV", "Blue Harbor Capital Fund II", "Blue Harbor Capital Fund"])
+def test_fund_vintages_never_match_each_other(index, name):
+    assert index.match_name(name, threshold=0.5) is None
+
+
+def test_equally_close_entities_are_ambiguous(index):
+    # One letter away from both "Partners" and "Partnors"
+    assert index.match_name("Meridian Ridge Partnxrs", threshold=0.7) is None
+
+
+def test_match_text_finds_the_earliest_multi_token_mention(index):
+    text = "Apple pie. Samsung Electronics reported to Blue Harbor Capital Fund III investors."
+    assert index.match_text(text, threshold=0.8) == (2, "Samsung Electronics Co., Ltd.", 1.0)
+    assert index.match_text("An apple a day; unknown company notes.", threshold=0.8) is None
+
+
+def test_prefix_filter_finds_every_alias_a_full_scan_would():
+    rng = random.Random(7)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(60)]
+    index = NameIndex()
+    for entity_id in range(300):
+        index.add(entity_id, " ".join(rng.sample(words, 3)))
+
+    for _ in range(200):
+        alias = rng.choice(list(index.alias_trigrams))
+        chars = list(alias)
+        chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+        candidate = "".join(chars)
+        if len(candidate.split()) != 3:
+            continue
+        trigrams = _trigrams(candidate)
+        scores = sorted(
+            (len(trigrams & t) / len(trigrams | t), a) for a, t in index.alias_trigrams.items() if len(a.split()) == 3
+        )
+        best_score, best = scores[-1]
+        found = index._fuzzy(candidate, 0.6)
+        if best_score < 0.6:
+            assert found is None
+        elif found is not None:
+            assert found == (best, best_score)
+        else:
+            # Only an ambiguous runner-up may hide the best alias
+            assert scores[-2][0] >= best_score - 0.05
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.company import Company
+from app.models.fund import Fund
+from app.services import entity_index, entity_store
+from app.services.entity_index import NameIndex
+from app.services.entity_store import upsert_entities, upsert_entity
+
+
+@pytest.fixture(autouse=True)
+def cold_caches(monkeypatch):
+    """Each test starts like a fresh process: no cached ids, no loaded name index."""
+    monkeypatch.setattr(entity_store, "_entity_ids", {})
+    monkeypatch.setattr(entity_index, "_indexes", {})
+
+
+def _count(session, model, normalized_name) -> int:
+    return session.exec(select(func.count()).select_from(model).where(model.normalized_name == normalized_name)).one()
+
+
+def test_spellings_of_one_name_share_a_row(session):
+    ids = upsert_entities("company", ["Upsert Widgets Ltd", "Upsert Widgets Limited", "upsert widgets"], session)
+    session.commit()
+
+    assert len(set(ids.values())) == 1
+    assert _count(session, Company, "upsert widgets") == 1
+    assert entity_store._entity_ids[("company", "upsert widgets")] == ids["upsert widgets"]
+
+
+def test_concurrent_upserts_converge_on_one_row(engine, monkeypatch):
+    # Every worker misses the index and inserts, as separate processes would
+    monkeypatch.setattr(entity_store, "get_name_index", lambda kind, session: NameIndex())
+    barrier = threading.Barrier(4)
+    ids, errors = [], []
+
+    def upsert():
+        try:
+            with Session(engine) as session:
+                barrier.wait()
+                ids.append(upsert_entity("fund", "Concurrent Capital Partners II", session))
+                session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=upsert) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert not errors
+    assert len(ids) == 4 and len(set(ids)) == 1
+    with Session(engine) as session:
+        assert _count(session, Fund, "concurrent capital partners ii") == 1
+
+
+def test_existing_row_is_read_back_after_the_conflict(engine, monkeypatch):
+    with Session(engine) as session:
+        created = upsert_entity("company", "Read Back Holdings", session)
+        session.commit()
+
+    # Another process: nothing cached, and its name index predates the row
+    monkeypatch.setattr(entity_store, "_entity_ids", {})
+    monkeypatch.setattr(entity_store, "get_name_index", lambda kind, session: NameIndex())
+    with Session(engine) as session:
+        assert upsert_entity("company", "Read Back Holdings Inc.", session) == created
+        session.commit()
+        assert _count(session, Company, "read back holdings") == 1
+
+
+def test_rollback_discards_cached_ids(session):
+    index = entity_index.get_name_index("fund", session)
+
+    entity_id = upsert_entity("fund", "Rolled Back Ventures III", session)
+    session.rollback()
+
+    assert ("fund", "rolled back ventures iii") not in entity_store._entity_ids
+    assert entity_id not in index.names
+    assert _count(session, Fund, "rolled back ventures iii") == 0
+
+    recreated = upsert_entity("fund", "Rolled Back Ventures III", session)
+    session.commit()
+    assert _count(session, Fund, "rolled back ventures iii") == 1
+    assert entity_store._entity_ids[("fund", "rolled back ventures iii")] == recreated
+    assert index.names[recreated] == "Rolled Back Ventures III"
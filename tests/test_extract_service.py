@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import select
+
+import app.services.chunked_extraction as chunked_extraction
+from app.core.database import bulk_insert
+from app.models.correction import Correction
+from app.models.document import Document
+from app.models.extracted_field import ExtractedField
+from app.models.financial import FinancialHighlight
+from app.models.investment import Investment
+from app.models.page_text import PageText
+from app.services.extract_service import extract_all_ai, extract_company_data_ai, extract_financials_ai
+
+COMPANY_RESPONSE = {
+    "company_name": "Idempotent Widgets Ltd", "holding_company": None, "business_description": "Widgets",
+    "head_office_location": "Seoul", "fund_role": "Lead", "investment_type": "Buyout",
+    "ownership_percent": "45%", "first_completion_date": None, "transaction_value": "USD 1.2bn",
+    "current_cost": None, "fair_value": None,
+}
+FINANCIAL_RESPONSE = {
+    "period": "FY2023", "currency": "USD m", "revenue": "1,234", "ebitda": "200", "ebitda_margin": "16%",
+    "ebit": None, "ebit_margin": None, "net_profit_after_tax": None, "capex": None, "net_debt": None,
+}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    async def generate(prompt, **kw):
+        financial = "revenue" in kw["format"]["properties"]
+        return json.dumps(FINANCIAL_RESPONSE if financial else COMPANY_RESPONSE)
+
+    monkeypatch.setattr(chunked_extraction, "call_ollama_async", generate)
+
+
+@pytest.fixture
+def document(session):
+    document = Document(file_name="report.pdf", file_path="re/po/report.pdf")
+    session.add(document)
+    session.commit()
+    bulk_insert(session, PageText, [
+        {"document_id": document.id, "page_number": n, "text": f"Page {n} Idempotent Widgets revenue FY2023"}
+        for n in range(1, 4)
+    ])
+    session.commit()
+    return document
+
+
+def _counts(session, document) -> dict:
+    def count(model, *where):
+        return session.exec(select(func.count()).select_from(model).where(*where)).one()
+
+    session.refresh(document)
+    return {
+        "fields": count(ExtractedField, ExtractedField.document_id == document.id),
+        "investments": count(Investment, Investment.company_id == document.company_id),
+        "financials": count(FinancialHighlight, FinancialHighlight.company_id == document.company_id),
+    }
+
+
+@pytest.mark.parametrize("extract", [extract_all_ai, extract_company_data_ai])
+def test_rerun_without_cache_does_not_add_rows(session, document, fake_llm, extract):
+    asyncio.run(extract(document.id, session, use_cache=False))
+    first = _counts(session, document)
+    asyncio.run(extract(document.id, session, use_cache=False))
+    assert _counts(session, document) == first
+    assert first["fields"] > 0 and first["investments"] == 1
+
+
+def test_rerun_updates_financials_in_place(session, document, fake_llm, monkeypatch):
+    asyncio.run(extract_company_data_ai(document.id, session, use_cache=False))
+    asyncio.run(extract_financials_ai(document.id, session, use_cache=False))
+    monkeypatch.setitem(FINANCIAL_RESPONSE, "revenue", "1,300")
+    asyncio.run(extract_financials_ai(document.id, session, use_cache=False))
+
+    session.refresh(document)
+    rows = session.exec(select(FinancialHighlight).where(FinancialHighlight.company_id == document.company_id)).all()
+    assert [(r.period, float(r.revenue)) for r in rows] == [("FY2023", 1300.0)]
+    revenue = session.exec(select(ExtractedField).where(
+        ExtractedField.document_id == document.id, ExtractedField.field_name == "revenue"
+    )).all()
+    assert [r.extracted_value for r in revenue] == ["1,300"]
+
+
+def test_corrected_provenance_rows_are_kept(session, document, fake_llm):
+    asyncio.run(extract_company_data_ai(document.id, session, use_cache=False))
+    field = session.exec(select(ExtractedField).where(
+        ExtractedField.document_id == document.id, ExtractedField.field_name == "head_office_location"
+    )).one()
+    session.add(Correction(extracted_field_id=field.id, corrected_value="Busan"))
+    session.commit()
+
+    asyncio.run(extract_company_data_ai(document.id, session, use_cache=False))
+    rows = session.exec(select(ExtractedField.id).where(
+        ExtractedField.document_id == document.id, ExtractedField.field_name == "head_office_location"
+    )).all()
+    assert field.id in rows and len(rows) == 2
@@ -0,0 +1,44 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from app.services import ingest_service
+
+
+@pytest.fixture
+def fake_detection(monkeypatch):
+    calls = []
+
+    async def generate(prompt, **kw):
+        calls.append(prompt)
+        entry = {"fund_name": "Bulk Test Fund IV", "company_name": "Bulk Test Industries"}
+        if "documents" in kw["format"]["properties"]:
+            return json.dumps({"documents": [{"document": 1, **entry}, {"document": 2, **entry}]})
+        return json.dumps(entry)
+
+    monkeypatch.setattr(ingest_service, "call_ollama_async", generate)
+    monkeypatch.setattr(ingest_service, "preview_from_cache", lambda content_hash: "Annual report")
+    return calls
+
+
+def _ingest(session, files):
+    return asyncio.run(ingest_service.ingest_files(files, session, use_cache=False))
+
+
+def test_bulk_ingest_stores_documents_and_reuses_links_for_known_bytes(session, fake_detection):
+    first = _ingest(session, [
+        ("a.pdf", io.BytesIO(b"%PDF-1.4 bulk a\n%%EOF")),
+        ("b.pdf", lambda: io.BytesIO(b"%PDF-1.4 bulk b\n%%EOF")),
+        ("notes.txt", io.BytesIO(b"hello")),
+    ])
+    assert [e["status"] for e in first] == ["created", "created", "rejected"]
+    assert first[0]["fund_id"] == first[1]["fund_id"]
+    assert first[0]["company_id"] == first[1]["company_id"]
+
+    calls = len(fake_detection)
+    again = _ingest(session, [("a-copy.pdf", io.BytesIO(b"%PDF-1.4 bulk a\n%%EOF"))])
+    assert len(fake_detection) == calls
+    assert again[0]["status"] == "duplicate"
+    assert (again[0]["fund_id"], again[0]["company_id"]) == (first[0]["fund_id"], first[0]["company_id"])
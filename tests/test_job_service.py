@@ -0,0 +1,51 @@
+import asyncio
+
+from app.models.document import Document
+from app.models.job import ExtractionJob
+from app.services import job_service
+
+
+def _job(session, status: str) -> ExtractionJob:
+    document = Document(file_name="job.pdf", file_path="jo/b/job.pdf")
+    session.add(document)
+    session.commit()
+    job = ExtractionJob(document_id=document.id, job_type="pdf", status=status)
+    session.add(job)
+    session.commit()
+    return job
+
+
+def test_recover_jobs_fails_interrupted_and_reschedules_queued(session, monkeypatch):
+    running, queued = _job(session, "running"), _job(session, "queued")
+    scheduled = []
+
+    async def run_job(job_id):
+        scheduled.append(job_id)
+
+    monkeypatch.setattr(job_service, "_run_job", run_job)
+
+    async def main():
+        await job_service.recover_jobs()
+        await asyncio.gather(*job_service._running_tasks)
+
+    asyncio.run(main())
+    session.refresh(running)
+    assert running.status == "failed" and "Interrupted" in running.error
+    assert queued.id in scheduled and running.id not in scheduled
+
+
+def test_claim_job_runs_a_job_once(session):
+    job = _job(session, "queued")
+    assert job_service._claim_job(job.id).status == "running"
+    assert job_service._claim_job(job.id) is None
+
+
+def test_enqueue_job_persists_and_schedules(session, monkeypatch):
+    document = Document(file_name="enqueue.pdf", file_path="en/q/enqueue.pdf")
+    session.add(document)
+    session.commit()
+    scheduled = []
+    monkeypatch.setattr(job_service, "_schedule", scheduled.append)
+
+    job = asyncio.run(job_service.enqueue_job(document.id, "pdf", session))
+    assert job.status == "queued" and scheduled == [job.id]
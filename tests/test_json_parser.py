@@ -0,0 +1,61 @@
+import pytest
+
+from app.utils.json_parser import StreamingJSONParser, parse_ai_fields, parse_ai_json, repair_json
+
+
+def test_streaming_parser_stops_at_the_closing_brace():
+    parser = StreamingJSONParser()
+    chunks = ["Sure! ```json\n{\"a\": ", "\"x}\", \"b\": [1, ", "{\"c\": 2}]}", " trailing prose"]
+    done = [parser.feed(chunk) for chunk in chunks]
+    assert done == [False, False, True, True]
+    assert parser.result() == {"a": "x}", "b": [1, {"c": 2}]}
+
+
+def test_streaming_parser_without_object():
+    parser = StreamingJSONParser()
+    parser.feed("no json here")
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{'a': 'b'}", {"a": "b"}),
+    ("{a: 1, b: 'x'}", {"a": 1, "b": "x"}),
+    ("{'a': None, 'b': True, 'c': False}", {"a": None, "b": True, "c": False}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    ('{"a": 1, // note\n "b": 2}', {"a": 1, "b": 2}),
+    ('{"name": Acme Holdings Ltd, "n": 2}', {"name": "Acme Holdings Ltd", "n": 2}),
+    ('{"revenue": 1,234.5, "n": 2}', {"revenue": "1,234.5", "n": 2}),
+])
+def test_repair(text, expected):
+    assert parse_ai_json(text) == expected
+
+
+def test_doubled_single_quote_inside_single_quoted_string():
+    assert parse_ai_json("{'a': 'it''s', 'b': ''}") == {"a": "it's", "b": ""}
+
+
+def test_bare_url_value_is_not_a_key_or_comment():
+    assert parse_ai_json('{"url": http://example.com/a?b=1, "n": 1}') == {"url": "http://example.com/a?b=1", "n": 1}
+    assert parse_ai_json("{site: https://example.com}") == {"site": "https://example.com"}
+
+
+def test_truncated_stream_is_closed():
+    assert parse_ai_json('{"a": {"b": [1, 2') == {"a": {"b": [1, 2]}}
+    assert parse_ai_json('{"a": 1, "b":') == {"a": 1, "b": None}
+    assert repair_json('{"a": "unterminated') == '{"a": "unterminated"}'
+
+
+def test_non_object_is_rejected():
+    with pytest.raises(ValueError):
+        parse_ai_json("[1, 2]")
+
+
+def test_parse_ai_fields_validates_schema():
+    values, failed = parse_ai_fields(
+        '{"company": {"name": "Acme", "tags": ["a", "b"], "meta": {"x": 1}, "ok": true}}',
+        ["name", "tags", "meta", "ok", "missing"]
+    )
+    assert values == {"name": "Acme", "tags": "a, b", "meta": None, "ok": "true", "missing": None}
+    assert failed == ["meta", "missing"]
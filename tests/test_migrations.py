@@ -0,0 +1,22 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from app.core.config import settings
+from app.core.database import ALEMBIC_INI
+
+
+@pytest.fixture(autouse=True)
+def postgres_url(monkeypatch):
+    # Offline SQL is generated for PostgreSQL; SQLite batch operations need a live connection
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql://reports@localhost/reports")
+
+
+def test_offline_upgrade_from_base_emits_sql(capsys):
+    command.upgrade(Config(ALEMBIC_INI), "head", sql=True)
+    assert "normalized_name" in capsys.readouterr().out
+
+
+def test_offline_upgrade_of_existing_rows_refuses_to_skip_the_backfill():
+    with pytest.raises(RuntimeError, match="normalized_name"):
+        command.upgrade(Config(ALEMBIC_INI), "0001:0002", sql=True)
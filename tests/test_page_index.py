@@ -0,0 +1,97 @@
+import os
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.utils import page_index
+from app.utils.page_index import BM25Index, load_or_build_index, select_relevant_pages, tokenize
+
+PAGES = [
+    (1, "Cover page. Quarterly report to limited partners."),
+    (2, "Letter from the managing partner about the market."),
+    (3, "Portfolio company overview: Acme Widgets, chief executive Jane Doe."),
+    (4, "Financial highlights: revenue 1,234 and EBITDA 200 for FY2023. Revenue grew."),
+    (5, "Valuation methodology and fair value hierarchy."),
+    (6, "Revenue by segment table."),
+    (7, "Glossary of terms."),
+    (8, "Appendix: fund terms and fees."),
+]
+QUERIES = {"revenue": "revenue sales turnover", "ebitda": "ebitda operating profit", "ceo": "chief executive ceo"}
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_INDEX_DIR", str(tmp_path / "page_index"))
+    return tmp_path / "page_index"
+
+
+def _hashes(pages):
+    return [(n, str(hash(text))) for n, text in pages]
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Revenue, of FY2023 was 1,234.") == ["revenue", "fy2023", "1", "234"]
+
+
+def test_bm25_ranking():
+    index = BM25Index.build(PAGES)
+    scores = index.scores("revenue ebitda")
+    assert max(scores, key=scores.get) == 4
+    assert scores[1] == 0
+    # Length normalization: a short page mentioning the term outranks a long one mentioning it twice
+    revenue = index.scores("revenue")
+    assert revenue[6] > revenue[4] > 0
+
+
+def test_top_k_keeps_each_fields_best_page_in_page_order():
+    selected = select_relevant_pages(uuid.uuid4(), _hashes(PAGES), QUERIES, lambda: PAGES, top_k=3)
+    assert selected == [3, 4, 6]
+
+
+def test_always_included_pages_take_slots_first():
+    selected = select_relevant_pages(uuid.uuid4(), _hashes(PAGES), QUERIES, lambda: PAGES, top_k=3, always_include=(1,))
+    assert selected == [1, 3, 6]
+
+
+def test_short_documents_are_returned_whole_without_an_index(index_dir):
+    selected = select_relevant_pages(uuid.uuid4(), _hashes(PAGES[:3]), QUERIES, lambda: pytest.fail("loaded"), top_k=5)
+    assert selected == [1, 2, 3]
+    assert not index_dir.exists()
+
+
+def test_index_is_reused_until_the_page_hashes_change():
+    document_id = uuid.uuid4()
+    loads = []
+
+    def load_pages():
+        loads.append(1)
+        return PAGES
+
+    load_or_build_index(document_id, _hashes(PAGES), load_pages)
+    load_or_build_index(document_id, _hashes(PAGES), load_pages)
+    assert len(loads) == 1
+
+    changed = PAGES[:-1] + [(8, "Appendix: revised fees.")]
+    load_or_build_index(document_id, _hashes(changed), lambda: changed)
+    load_or_build_index(document_id, _hashes(changed), load_pages)
+    assert len(loads) == 1
+
+
+def test_least_recently_used_indexes_are_evicted_first(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(3)]
+    for age, document_id in zip((300, 200, 100), ids):
+        load_or_build_index(document_id, _hashes(PAGES), lambda: PAGES)
+        path = page_index._index_path(document_id)
+        os.utime(path, (os.path.getmtime(path) - age,) * 2)
+
+    # Reading the oldest marks it as recently used
+    load_or_build_index(ids[0], _hashes(PAGES), lambda: pytest.fail("rebuilt"))
+
+    size = os.path.getsize(page_index._index_path(ids[0]))
+    monkeypatch.setattr(settings, "PAGE_INDEX_MAX_BYTES", size * 2)
+    newest = uuid.uuid4()
+    load_or_build_index(newest, _hashes(PAGES), lambda: PAGES)
+
+    kept = [os.path.exists(page_index._index_path(d)) for d in (*ids, newest)]
+    assert kept == [True, False, False, True]
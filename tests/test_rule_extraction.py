@@ -0,0 +1,70 @@
+import pytest
+
+from app.services.rule_extraction import extract_financials_by_rules, match_row_label, read_financial_table
+
+
+def _table(rows, page_number=4):
+    return {"page_number": page_number, "rows": rows}
+
+
+@pytest.mark.parametrize("cell, field", [
+    ("Revenue (USD m)", "revenue"),
+    ("Net sales", "revenue"),
+    ("Adj. EBITDA¹", "ebitda"),
+    ("EBITDA margin", "ebitda_margin"),
+    ("Operating profit", "ebit"),
+    ("NPAT", "net_profit_after_tax"),
+    ("Capital expenditure", "capex"),
+    ("Net debt:", "net_debt"),
+    ("Revenue growth", None),
+])
+def test_row_labels(cell, field):
+    assert match_row_label(cell) == field
+
+
+@pytest.mark.parametrize("header, period", [
+    (["USD m", "FY2022", "FY2023", "FY2024E"], "FY2023"),
+    (["USD m", "FY2023A", "FY2024 Budget", "FY2025F"], "FY2023A"),
+    (["", "Dec-22", "Dec-23", "Jun-24 LTM"], "Dec-23"),
+    (["", "2021", "2022", "2023"], "2023"),
+])
+def test_header_picks_the_latest_actual_period(header, period):
+    reading = read_financial_table(_table([header, ["Revenue", "1", "2", "3"]]))
+    assert reading["period"] == period
+
+
+def test_estimate_only_headers_fall_back_to_the_latest_estimate():
+    reading = read_financial_table(_table([["", "FY2024E", "FY2025E"], ["Revenue", "10", "12"]]))
+    assert reading["period"] == "FY2025E"
+
+
+def test_table_without_a_period_header_is_ignored():
+    assert read_financial_table(_table([["Revenue", "1,234"], ["EBITDA", "200"]])) is None
+
+
+def test_table_values_with_empty_cells_and_text_fallback():
+    table = _table([
+        ["KRW bn", "Dec-22", "Dec-23", "Dec-24E"],
+        ["Revenue", "1,100", "1,234", "1,400"],
+        ["EBITDA", "180", "n/a", "240"],
+        ["EBITDA margin", "16.4%", "-", "17.1%"],
+        ["Net debt", "(50)", "(45)", "(30)"],
+    ])
+    pages = [(2, "Letter to investors."), (5, "EBITDA margin of 15.9% in 2023, down from 2022.")]
+    data, provenance = extract_financials_by_rules([table], pages)
+
+    assert data["period"] == "Dec-23"
+    assert data["currency"] == "KRW bn"
+    assert data["revenue"] == "1,234"
+    assert data["net_debt"] == "(45)"
+    assert "ebitda" not in data  # "n/a" is not a value and no text line states one
+    assert data["ebitda_margin"] == "15.9%"
+    assert provenance["revenue"] == {"page_number": 4, "confidence": 0.9, "method": "table"}
+    assert provenance["ebitda_margin"] == {"page_number": 5, "confidence": 0.7, "method": "regex"}
+
+
+def test_text_lines_with_several_numbers_are_skipped():
+    pages = [(3, "Revenue 1,100 1,234 1,400"), (6, "Revenue reached USD 1.2bn")]
+    data, provenance = extract_financials_by_rules([], pages)
+    assert data == {"revenue": "USD 1.2bn"}
+    assert provenance["revenue"]["page_number"] == 6
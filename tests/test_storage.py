@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from app.core.storage import LocalStorage, S3Storage, shard_key
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 8 + b"\n%%EOF"
+HASH = "abcdef0123456789" * 4
+
+
+@pytest.fixture
+def local(tmp_path):
+    return LocalStorage(str(tmp_path / "root"))
+
+
+@pytest.fixture
+def s3():
+    moto = pytest.importorskip("moto")
+    pytest.importorskip("boto3")
+    with moto.mock_aws():
+        storage = S3Storage("reports", prefix="pdfs", region="us-east-1",
+                            access_key_id="test", secret_access_key="test")
+        storage.client.create_bucket(Bucket="reports")
+        yield storage
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage(request):
+    return request.getfixturevalue(request.param)
+
+
+def _put(storage, key: str, content: bytes = CONTENT):
+    path = os.path.join(storage.tmp_dir(), "upload.part")
+    with open(path, "wb") as f:
+        f.write(content)
+    storage.put_file(path, key)
+    assert not os.path.exists(path)
+
+
+def test_shard_key_layout():
+    assert shard_key(HASH) == f"ab/cd/{HASH}.pdf"
+    assert shard_key(HASH, ".json") == f"ab/cd/{HASH}.json"
+
+
+def test_put_exists_and_read(storage):
+    key = shard_key(HASH)
+    assert not storage.exists(key)
+    _put(storage, key)
+
+    assert storage.exists(key)
+    assert storage.size(key) == len(CONTENT)
+    with storage.open(key) as f:
+        assert f.read() == CONTENT
+    with storage.local_path(key) as path, open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+    storage.delete(key)
+    assert not storage.exists(key)
+
+
+def test_ranged_reads(storage):
+    key = shard_key(HASH)
+    _put(storage, key)
+    size = len(CONTENT)
+
+    assert storage.read_range(key, 0, 8) == CONTENT[:8]
+    assert storage.read_range(key, 100, 300) == CONTENT[100:300]
+    assert storage.read_range(key, size - 6, size) == b"\n%%EOF"
+    assert storage.read_range(key, 5, 5) == b""
+    with storage.open(key) as f:
+        f.seek(-6, os.SEEK_END)
+        assert f.read() == b"\n%%EOF"
+        f.seek(9)
+        assert f.read(4) == bytes(range(4))
+
+
+def test_local_layout_is_sharded_under_the_root(local):
+    _put(local, shard_key(HASH))
+    assert os.path.isfile(os.path.join(local.root, "ab", "cd", f"{HASH}.pdf"))
+
+
+def test_s3_layout_is_sharded_under_the_prefix(s3):
+    _put(s3, shard_key(HASH))
+    listed = s3.client.list_objects_v2(Bucket="reports")["Contents"]
+    assert [o["Key"] for o in listed] == [f"pdfs/ab/cd/{HASH}.pdf"]
+
+
+def test_local_legacy_paths_resolve_under_the_root(local, tmp_path, monkeypatch):
+    with open(os.path.join(local.root, "1234_report.pdf"), "wb") as f:
+        f.write(CONTENT)
+    assert local.exists("pdf_samples/1234_report.pdf")
+
+    # A file relative to the working directory is not a key
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "outside.pdf").write_bytes(CONTENT)
+    assert not local.exists("outside.pdf")
+
+
+@pytest.mark.parametrize("key", ["../outside.pdf", "ab/../../outside.pdf", "pdf_samples/../x.pdf"])
+def test_local_rejects_keys_outside_the_root(local, key):
+    with pytest.raises(ValueError):
+        local.exists(key)